@@ -0,0 +1,118 @@
+"""
+Background Worker
+
+Long-lived worker shared by every Streamlit session: an asyncio event loop in a
+background thread for network I/O (Cookidoo, scraping) and a thread pool for
+blocking calls (Gemini). UI code submits jobs and polls their futures.
+"""
+
+import asyncio
+import queue
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Coroutine, Iterator, Optional
+
+
+# Threads available for blocking jobs (Gemini calls, batch extraction), shared by
+# every session: each pending answer, photo analysis, response stream or batch
+# holds one thread until Gemini replies, and further jobs queue behind them.
+# Size it for the expected number of concurrent users (secret `worker_threads`).
+WORKER_THREADS = 8
+
+_STREAM_END = object()
+
+
+class BackgroundWorker:
+    """Persistent event loop plus thread pool executing jobs off the UI thread."""
+    
+    def __init__(self, max_workers: int = WORKER_THREADS):
+        """
+        Start the event loop thread and the thread pool.
+        
+        Args:
+            max_workers: Number of threads for blocking jobs
+        """
+        self.loop = asyncio.new_event_loop()
+        self._loop_thread = threading.Thread(target=self.loop.run_forever, daemon=True, name="worker-loop")
+        self._loop_thread.start()
+        self.executor = ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="worker")
+    
+    def submit_coroutine(self, coro: Coroutine) -> Future:
+        """
+        Schedule a coroutine on the worker's event loop.
+        
+        Args:
+            coro: Coroutine to run
+        
+        Returns:
+            Future: Future of the coroutine result
+        """
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+    
+    def submit(self, func: Callable, *args, **kwargs) -> Future:
+        """
+        Run a blocking function on the worker's thread pool.
+        
+        Args:
+            func: Function to run
+            *args: Positional arguments
+            **kwargs: Keyword arguments
+        
+        Returns:
+            Future: Future of the function result
+        """
+        return self.executor.submit(func, *args, **kwargs)
+    
+    def run(self, coro: Coroutine, timeout: Optional[float] = None) -> Any:
+        """
+        Run a coroutine on the event loop and wait for its result.
+        
+        Args:
+            coro: Coroutine to run
+            timeout: Maximum wait in seconds
+        
+        Returns:
+            Any: The coroutine result
+        """
+        return self.submit_coroutine(coro).result(timeout)
+    
+    def stream(self, func: Callable[..., Iterator], *args, **kwargs) -> Iterator:
+        """
+        Consume a blocking generator on the thread pool and relay its items.
+        
+        The generator's I/O happens on a worker thread; the caller only reads
+        items from a queue as they arrive. Exceptions are re-raised here.
+        
+        Args:
+            func: Generator function
+            *args: Positional arguments
+            **kwargs: Keyword arguments
+        
+        Yields:
+            Items produced by the generator
+        """
+        items: queue.Queue = queue.Queue()
+        
+        def produce():
+            try:
+                for item in func(*args, **kwargs):
+                    items.put(item)
+            except BaseException as e:
+                items.put(e)
+            finally:
+                items.put(_STREAM_END)
+        
+        self.executor.submit(produce)
+        
+        while True:
+            item = items.get()
+            if item is _STREAM_END:
+                return
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+    
+    def shutdown(self) -> None:
+        """Stop the thread pool and the event loop."""
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        self.loop.call_soon_threadsafe(self.loop.stop)
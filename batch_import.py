@@ -0,0 +1,149 @@
+"""
+Batch Import
+
+Concurrent recipe extraction from many cookbook photos: Gemini calls run on a
+thread pool behind a shared rate limiter, and duplicate pages are skipped by
+content hash.
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Iterator, Optional
+from pydantic import ValidationError
+from gemini_service import GeminiService, extract_recipe_json, parse_adaptation
+from schemas import CustomRecipe
+
+
+# Default limits of a batch import
+BATCH_MAX_WORKERS = 4
+BATCH_REQUESTS_PER_MINUTE = 30
+BATCH_MAX_RETRIES = 2
+BATCH_RETRY_DELAY = 2.0
+
+BATCH_EXTRACTION_PROMPT = (
+    "Extrais la recette de cette page de livre de cuisine et adapte-la pour le Thermomix TM6 "
+    "selon tes instructions. Présente la version adaptée et termine par le bloc JSON."
+)
+BATCH_STRUCTURED_PROMPT = (
+    "Extrais la recette de cette page de livre de cuisine et adapte-la pour le Thermomix TM6 "
+    "selon tes instructions."
+)
+
+
+class RateLimiter:
+    """Thread-safe token bucket limiting the number of calls per minute."""
+    
+    def __init__(self, requests_per_minute: float, burst: Optional[int] = None):
+        """
+        Initialize the rate limiter.
+        
+        Args:
+            requests_per_minute: Sustained call rate
+            burst: Maximum number of calls allowed back to back (defaults to 1)
+        """
+        self.rate = requests_per_minute / 60.0
+        self.capacity = max(1, burst or 1)
+        self._tokens = float(self.capacity)
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def acquire(self) -> None:
+        """Block until a call is allowed."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+                self._updated_at = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class BatchImporter:
+    """Extracts recipes from many page images concurrently."""
+    
+    def __init__(
+        self,
+        gemini_service: GeminiService,
+        max_workers: int = BATCH_MAX_WORKERS,
+        requests_per_minute: float = BATCH_REQUESTS_PER_MINUTE,
+        max_retries: int = BATCH_MAX_RETRIES,
+        prompt: Optional[str] = None,
+    ):
+        """
+        Initialize the importer.
+        
+        Args:
+            gemini_service: Service whose system instruction produces the JSON block
+            max_workers: Number of concurrent Gemini calls
+            requests_per_minute: Gemini calls allowed per minute, retries included
+            max_retries: Retries per page after a failed call
+            prompt: Instruction sent with every page (defaults to the prompt
+                matching the service's output mode)
+        """
+        self.gemini_service = gemini_service
+        self.max_workers = max(1, max_workers)
+        self.rate_limiter = RateLimiter(requests_per_minute, burst=self.max_workers)
+        self.max_retries = max_retries
+        self.prompt = prompt or (
+            BATCH_STRUCTURED_PROMPT if gemini_service.structured_output else BATCH_EXTRACTION_PROMPT
+        )
+    
+    def extract(self, image: dict) -> dict:
+        """
+        Extract one recipe from a page image, retrying failed calls.
+        
+        Args:
+            image: Gemini inline blob ({"mime_type", "data"})
+        
+        Returns:
+            dict: "recipe" (CustomRecipe or None), "text" and "error" keys
+        """
+        error = None
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                time.sleep(BATCH_RETRY_DELAY * 2 ** (attempt - 1))
+            self.rate_limiter.acquire()
+            try:
+                text = self.gemini_service.generate_content([self.prompt, image])
+            except Exception as e:
+                error = str(e)
+                continue
+            
+            if self.gemini_service.structured_output:
+                recipe = parse_adaptation(text).recipe
+                error = None if recipe else "Aucune recette détectée sur cette page"
+                return {"recipe": recipe, "text": text, "error": error}
+            
+            recipe_json = extract_recipe_json(text)
+            if not recipe_json:
+                return {"recipe": None, "text": text, "error": "Aucune recette détectée sur cette page"}
+            try:
+                return {"recipe": CustomRecipe.model_validate(recipe_json), "text": text, "error": None}
+            except ValidationError as e:
+                return {"recipe": None, "text": text, "error": f"Recette incomplète: {e.error_count()} champ(s) invalide(s)"}
+        
+        return {"recipe": None, "text": "", "error": error}
+    
+    def extract_all(self, images: dict[str, dict], skip: Optional[set[str]] = None) -> Iterator[tuple[str, dict]]:
+        """
+        Extract recipes from many pages, yielding results as they complete.
+        
+        Args:
+            images: Gemini inline blobs keyed by content hash (duplicates collapse)
+            skip: Hashes of pages that were already imported
+        
+        Yields:
+            tuple[str, dict]: Page hash and the result of extract()
+        """
+        pending = {h: image for h, image in images.items() if h not in (skip or set())}
+        if not pending:
+            return
+        
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(pending)), thread_name_prefix="batch-import") as executor:
+            futures = {executor.submit(self.extract, image): h for h, image in pending.items()}
+            for future in as_completed(futures):
+                yield futures[future], future.result()
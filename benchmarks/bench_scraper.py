@@ -0,0 +1,226 @@
+"""
+Scraper Benchmark
+
+Runs the recipe parsing logic of scraper.py against recorded HTML pages, offline,
+and reports per-stage timings, extraction accuracy and peak memory.
+
+Usage:
+    python benchmarks/bench_scraper.py [--repeat 50] [--json results.json] [--min-accuracy 0.8]
+
+Each fixture is a pair of files in benchmarks/fixtures: `<name>.html` holds the
+saved page and `<name>.json` holds its source URL and the expected extraction.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+from typing import Callable
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bs4 import BeautifulSoup
+from scraper import (
+    JSON_LD_PATTERN,
+    JSON_LD_WRAPPER_PATTERN,
+    find_recipe_node,
+    parse_duration_minutes,
+    parse_recipe_html,
+)
+from site_extractors import GENERIC_EXTRACTOR, get_extractor
+
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+# Extra ISO-8601 durations exercised by the duration parsing stage
+DURATIONS = ["PT15M", "PT1H", "PT1H30M", "PT3H20M", "P0DT2H5M", "PT90M", "PT0S", "45 min"]
+
+
+def load_fixtures(directory: str) -> list[dict]:
+    """
+    Load every recorded page with its expected extraction.
+    
+    Args:
+        directory: Fixtures directory
+    
+    Returns:
+        list[dict]: Fixtures with "name", "url", "html" and "expected" keys
+    """
+    fixtures = []
+    for filename in sorted(os.listdir(directory)):
+        if not filename.endswith(".html"):
+            continue
+        name = filename[:-len(".html")]
+        with open(os.path.join(directory, filename), encoding="utf-8") as f:
+            html = f.read()
+        with open(os.path.join(directory, f"{name}.json"), encoding="utf-8") as f:
+            meta = json.load(f)
+        fixtures.append({"name": name, "url": meta["url"], "html": html, "expected": meta["expected"]})
+    return fixtures
+
+
+def time_stage(func: Callable[[], object], repeat: int) -> float:
+    """
+    Time a stage and return the median duration in microseconds.
+    
+    Args:
+        func: Stage to run
+        repeat: Number of runs
+    
+    Returns:
+        float: Median run time in microseconds
+    """
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1e6)
+    return statistics.median(samples)
+
+
+def decode_json_ld(html: str) -> list:
+    """JSON-LD pre-pass: pull out and decode the ld+json scripts."""
+    documents = []
+    for match in JSON_LD_PATTERN.finditer(html):
+        try:
+            documents.append(json.loads(JSON_LD_WRAPPER_PATTERN.sub('', match.group(1)).strip(), strict=False))
+        except ValueError:
+            continue
+    return documents
+
+
+def score_list(expected: list[str], actual: list[str]) -> float:
+    """F1 score of exact item matches between two lists."""
+    if not expected and not actual:
+        return 1.0
+    matched = len(set(expected) & set(actual))
+    if not matched:
+        return 0.0
+    precision = matched / len(actual)
+    recall = matched / len(expected)
+    return 2 * precision * recall / (precision + recall)
+
+
+def score_extraction(expected: dict, actual: dict) -> float:
+    """
+    Score an extraction against the expected fields.
+    
+    Args:
+        expected: Expected fields (only the keys present are scored)
+        actual: Result of parse_recipe_html
+    
+    Returns:
+        float: Mean per-field score between 0 and 1
+    """
+    scores = []
+    for field, value in expected.items():
+        if isinstance(value, list):
+            scores.append(score_list(value, actual.get(field, [])))
+        else:
+            scores.append(1.0 if actual.get(field) == value else 0.0)
+    return sum(scores) / len(scores) if scores else 1.0
+
+
+def bench_fixture(fixture: dict, repeat: int) -> dict:
+    """
+    Benchmark every parsing stage on one page.
+    
+    Args:
+        fixture: Loaded fixture
+        repeat: Number of runs per stage
+    
+    Returns:
+        dict: Stage timings (µs), accuracy, peak memory and extraction path
+    """
+    html, url = fixture["html"], fixture["url"]
+    
+    documents = decode_json_ld(html)
+    nodes = [node for node in (find_recipe_node(doc) for doc in documents) if node]
+    durations = [node.get("totalTime") or node.get("cookTime") for node in nodes] + DURATIONS
+    durations = [d for d in durations if d]
+    soup = BeautifulSoup(html, 'html.parser')
+    extractor = get_extractor(url) or GENERIC_EXTRACTOR
+    
+    timings = {
+        "json_ld_prepass": time_stage(lambda: decode_json_ld(html), repeat),
+        "graph_lookup": time_stage(lambda: [find_recipe_node(doc) for doc in documents], repeat),
+        "duration_parse": time_stage(lambda: [parse_duration_minutes(d) for d in durations], repeat),
+        "soup_build": time_stage(lambda: BeautifulSoup(html, 'html.parser'), repeat),
+        "selector_fallback": time_stage(lambda: extractor.extract(soup, {}), repeat),
+        "full_parse": time_stage(lambda: parse_recipe_html(html, url), repeat),
+    }
+    
+    tracemalloc.start()
+    result = parse_recipe_html(html, url)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    
+    if result.get("needs_ai_extraction"):
+        path = "raw_text"
+    elif nodes:
+        path = "json_ld"
+    else:
+        path = "selectors"
+    
+    return {
+        "name": fixture["name"],
+        "size_kb": len(html.encode("utf-8")) / 1024,
+        "path": path,
+        "timings_us": timings,
+        "accuracy": score_extraction(fixture["expected"], result),
+        "peak_memory_kb": peak / 1024,
+    }
+
+
+def print_report(results: list[dict]) -> None:
+    """Print a table of the benchmark results."""
+    stages = list(results[0]["timings_us"])
+    header = f"{'fixture':<18}{'KB':>6}  {'path':<10}" + "".join(f"{stage:>18}" for stage in stages)
+    header += f"{'accuracy':>10}{'peak KB':>10}"
+    print(header)
+    print("-" * len(header))
+    
+    for r in results:
+        row = f"{r['name']:<18}{r['size_kb']:>6.1f}  {r['path']:<10}"
+        row += "".join(f"{r['timings_us'][stage]:>18.1f}" for stage in stages)
+        row += f"{r['accuracy']:>10.0%}{r['peak_memory_kb']:>10.1f}"
+        print(row)
+    
+    print("-" * len(header))
+    mean_accuracy = sum(r["accuracy"] for r in results) / len(results)
+    total_parse = sum(r["timings_us"]["full_parse"] for r in results)
+    print(f"Timings are medians in µs. Mean accuracy: {mean_accuracy:.0%}. "
+          f"Total full_parse: {total_parse:.1f} µs. "
+          f"Max peak memory: {max(r['peak_memory_kb'] for r in results):.1f} KB.")
+
+
+def main() -> None:
+    """Run the benchmark from the command line."""
+    parser = argparse.ArgumentParser(description="Benchmark recipe page parsing on recorded fixtures.")
+    parser.add_argument("--repeat", type=int, default=50, help="runs per stage (default: 50)")
+    parser.add_argument("--fixtures", default=FIXTURES_DIR, help="fixtures directory")
+    parser.add_argument("--json", dest="json_path", help="also write the results to this JSON file")
+    parser.add_argument("--min-accuracy", type=float, help="exit with an error if mean accuracy is below this (0-1)")
+    args = parser.parse_args()
+    
+    fixtures = load_fixtures(args.fixtures)
+    if not fixtures:
+        sys.exit(f"No fixtures found in {args.fixtures}")
+    
+    results = [bench_fixture(fixture, args.repeat) for fixture in fixtures]
+    print_report(results)
+    
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    
+    mean_accuracy = sum(r["accuracy"] for r in results) / len(results)
+    if args.min_accuracy is not None and mean_accuracy < args.min_accuracy:
+        sys.exit(f"Mean accuracy {mean_accuracy:.0%} is below {args.min_accuracy:.0%}")
+
+
+if __name__ == "__main__":
+    main()
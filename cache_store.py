@@ -0,0 +1,268 @@
+"""
+Cache Store
+
+Two-tier key/value cache: an in-memory LRU in front of a persistent SQLite store,
+with a TTL, a size limit, optional compression, stale-while-revalidate and
+hit/miss counters.
+
+The plain methods do SQLite I/O on the calling thread; async code uses the
+a-prefixed variants, which run it in a worker thread.
+"""
+
+import asyncio
+import copy
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from typing import Any, Optional
+
+
+# Directory holding the persistent cache files, unless COOKIDOO_CACHE_DIR is set
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache")
+
+# Minimum seconds between two on-disk access time updates of an entry served from memory
+ACCESS_TOUCH_INTERVAL = 60
+
+
+def cache_path(name: str) -> str:
+    """
+    Build the path of a SQLite cache file inside the cache directory.
+    
+    COOKIDOO_CACHE_DIR is read on each call, so a .env loaded after this
+    module was imported still applies.
+    
+    Args:
+        name: Cache name (e.g. "recipe_details")
+    
+    Returns:
+        str: Absolute path of the cache database
+    """
+    return os.path.join(os.getenv("COOKIDOO_CACHE_DIR", DEFAULT_CACHE_DIR), f"{name}.sqlite3")
+
+
+class PersistentCache:
+    """In-memory LRU backed by a SQLite table, both bounded and TTL-limited."""
+    
+    def __init__(
+        self,
+        path: Optional[str],
+        ttl: float,
+        max_entries: int = 1000,
+        memory_entries: int = 256,
+        stale_ttl: float = 0,
+        compress: bool = False,
+    ):
+        """
+        Initialize the cache.
+        
+        Args:
+            path: SQLite file path, or None for a memory-only cache
+            ttl: Entry lifetime in seconds
+            max_entries: Maximum number of entries kept on disk
+            memory_entries: Maximum number of entries kept in memory
+            stale_ttl: Extra seconds during which expired entries are still
+                served by get_entry() while the caller revalidates them
+            compress: Store zlib-compressed payloads on disk
+        """
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.memory_entries = memory_entries
+        self.stale_ttl = stale_ttl
+        self.compress = compress
+        # key -> (value, created_at, last accessed_at written to disk)
+        self._memory: OrderedDict[str, tuple[Any, float, float]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "memory_hits": 0, "disk_hits": 0, "stale_hits": 0}
+        self._db: Optional[sqlite3.Connection] = None
+        
+        if path:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                "key TEXT PRIMARY KEY, value BLOB NOT NULL, "
+                "created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS entries_lru ON entries (accessed_at)")
+            self._db.commit()
+    
+    def get(self, key: str) -> Optional[Any]:
+        """
+        Return the cached value for `key`, or None if missing or expired.
+        
+        Args:
+            key: Cache key
+            
+        Returns:
+            Optional[Any]: The cached value
+        """
+        entry = self._lookup(key, allow_stale=False)
+        return entry[0] if entry else None
+    
+    async def aget(self, key: str) -> Optional[Any]:
+        """get() without blocking the event loop."""
+        return await asyncio.to_thread(self.get, key)
+    
+    def get_entry(self, key: str) -> Optional[tuple[Any, bool]]:
+        """
+        Return the cached value for `key` along with its staleness.
+        
+        Expired entries are still returned during the stale_ttl grace period so
+        callers can serve them immediately and refresh in the background.
+        
+        Args:
+            key: Cache key
+            
+        Returns:
+            Optional[tuple[Any, bool]]: (value, is_stale), or None if missing
+        """
+        return self._lookup(key, allow_stale=True)
+    
+    async def aget_entry(self, key: str) -> Optional[tuple[Any, bool]]:
+        """get_entry() without blocking the event loop."""
+        return await asyncio.to_thread(self.get_entry, key)
+    
+    def _lookup(self, key: str, allow_stale: bool) -> Optional[tuple[Any, bool]]:
+        """Look `key` up in memory then on disk, tracking hits and misses."""
+        now = time.time()
+        max_age = self.ttl + (self.stale_ttl if allow_stale else 0)
+        
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                value, created_at, touched_at = entry
+                if now - created_at < max_age:
+                    self._memory.move_to_end(key)
+                    if self._db is not None and now - touched_at >= ACCESS_TOUCH_INTERVAL:
+                        # Keep hot entries recent for the disk LRU, without a write per hit
+                        self._db.execute(
+                            "UPDATE entries SET accessed_at = ? WHERE key = ?", (now, key)
+                        )
+                        self._db.commit()
+                        self._memory[key] = (value, created_at, now)
+                    # A copy, so callers cannot mutate the cached value
+                    return self._hit("memory_hits", copy.deepcopy(value), now - created_at)
+                if now - created_at >= self.ttl + self.stale_ttl:
+                    del self._memory[key]
+            
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT value, created_at FROM entries WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None:
+                    if now - row[1] < max_age:
+                        value = self._decode(row[0])
+                        self._db.execute(
+                            "UPDATE entries SET accessed_at = ? WHERE key = ?", (now, key)
+                        )
+                        self._db.commit()
+                        self._remember(key, copy.deepcopy(value), row[1], now)
+                        return self._hit("disk_hits", value, now - row[1])
+                    if now - row[1] >= self.ttl + self.stale_ttl:
+                        self._db.execute("DELETE FROM entries WHERE key = ?", (key,))
+                        self._db.commit()
+            
+            self._stats["misses"] += 1
+            return None
+    
+    def _hit(self, tier: str, value: Any, age: float) -> tuple[Any, bool]:
+        """Record a hit on `tier` and return (value, is_stale)."""
+        stale = age >= self.ttl
+        self._stats["hits"] += 1
+        self._stats[tier] += 1
+        if stale:
+            self._stats["stale_hits"] += 1
+        return value, stale
+    
+    def set(self, key: str, value: Any) -> None:
+        """
+        Store a JSON-serializable value under `key`.
+        
+        Args:
+            key: Cache key
+            value: Value to store
+        """
+        now = time.time()
+        
+        with self._lock:
+            self._remember(key, copy.deepcopy(value), now, now)
+            
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO entries (key, value, created_at, accessed_at) "
+                    "VALUES (?, ?, ?, ?)",
+                    (key, self._encode(value), now, now),
+                )
+                self._evict()
+                self._db.commit()
+    
+    async def aset(self, key: str, value: Any) -> None:
+        """set() without blocking the event loop."""
+        await asyncio.to_thread(self.set, key, value)
+    
+    def delete(self, key: str) -> None:
+        """Remove `key` from both tiers."""
+        with self._lock:
+            self._memory.pop(key, None)
+            if self._db is not None:
+                self._db.execute("DELETE FROM entries WHERE key = ?", (key,))
+                self._db.commit()
+    
+    async def adelete(self, key: str) -> None:
+        """delete() without blocking the event loop."""
+        await asyncio.to_thread(self.delete, key)
+    
+    def clear(self) -> None:
+        """Remove every entry from both tiers."""
+        with self._lock:
+            self._memory.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM entries")
+                self._db.commit()
+    
+    @property
+    def stats(self) -> dict:
+        """Hit/miss counters and current sizes."""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["memory_size"] = len(self._memory)
+            stats["disk_size"] = (
+                self._db.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+                if self._db is not None else 0
+            )
+        
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+        return stats
+    
+    def _remember(self, key: str, value: Any, created_at: float, touched_at: float) -> None:
+        """Insert into the memory tier, evicting the least recently used entry."""
+        self._memory[key] = (value, created_at, touched_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+    
+    def _evict(self) -> None:
+        """Drop expired rows, then the least recently used ones above max_entries."""
+        self._db.execute(
+            "DELETE FROM entries WHERE created_at <= ?",
+            (time.time() - self.ttl - self.stale_ttl,),
+        )
+        self._db.execute(
+            "DELETE FROM entries WHERE key IN ("
+            "SELECT key FROM entries ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,),
+        )
+    
+    def _encode(self, value: Any) -> bytes:
+        """Serialize a value for the SQLite tier."""
+        data = json.dumps(value, ensure_ascii=False, default=str).encode("utf-8")
+        return zlib.compress(data) if self.compress else data
+    
+    def _decode(self, data: bytes) -> Any:
+        """Deserialize a value from the SQLite tier."""
+        return json.loads(zlib.decompress(data) if self.compress else data)
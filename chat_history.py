@@ -0,0 +1,153 @@
+"""
+Chat History
+
+Bounded chat-history window for Gemini prompts: recent turns are kept verbatim,
+older ones are folded into a compact summary and large payloads are dropped.
+"""
+
+import re
+from functools import lru_cache
+
+
+# Maximum number of most recent messages kept verbatim
+HISTORY_WINDOW = 8
+
+# Older messages are folded into the summary in blocks of this many messages,
+# so the summarized prefix stays identical (and cacheable) for several turns
+HISTORY_FOLD_STEP = 4
+
+# Size limits of the summary
+SUMMARY_LINE_CHARS = 160
+SUMMARY_MAX_CHARS = 2000
+
+# Payloads that are never worth resending: recipe JSON blocks and scraped data
+LARGE_PAYLOAD_PATTERNS = [
+    re.compile(r'```json\s*.*?```', re.DOTALL),
+    re.compile(r'\[Données de recette extraites:\].*', re.DOTALL),
+    re.compile(r'\[Données non structurées[^\]]*\].*', re.DOTALL),
+]
+
+# Marker of a full structured recipe in an assistant response
+RECIPE_MARKER = "### Ingrédients"
+
+
+def strip_large_payloads(text: str) -> str:
+    """
+    Remove JSON blocks and scraped page data from a message.
+    
+    Args:
+        text: Message content
+    
+    Returns:
+        str: Content without large payloads
+    """
+    for pattern in LARGE_PAYLOAD_PATTERNS:
+        text = pattern.sub('', text)
+    return text.strip()
+
+
+def _first_line(text: str, limit: int = SUMMARY_LINE_CHARS) -> str:
+    """First meaningful line of a message, without markdown decoration."""
+    for line in text.splitlines():
+        line = line.strip().lstrip('#').strip().strip('*').strip()
+        if line:
+            return line if len(line) <= limit else line[:limit - 1] + "…"
+    return ""
+
+
+def _recipe_title(text: str) -> str:
+    """Best-effort title of a recipe response: the line before the ingredients, or the first line."""
+    head = text.split(RECIPE_MARKER, 1)[0]
+    lines = [line for line in head.splitlines() if line.strip() and 'Avertissements' not in line]
+    return _first_line(lines[0]) if lines else _first_line(text)
+
+
+@lru_cache(maxsize=256)
+def summarize_messages(messages: tuple[tuple[str, str], ...]) -> str:
+    """
+    Summarize older messages into a compact, deterministic recap.
+    
+    Results are memoized, so an unchanged prefix costs nothing on later turns.
+    
+    Args:
+        messages: (role, content) pairs, oldest first
+    
+    Returns:
+        str: Summary text
+    """
+    lines = []
+    for role, content in messages:
+        content = strip_large_payloads(content)
+        if role == "user":
+            lines.append(f"- Utilisateur : {_first_line(content)}")
+        elif RECIPE_MARKER in content:
+            lines.append(f"- Assistant : recette proposée « {_recipe_title(content)} »")
+        else:
+            lines.append(f"- Assistant : {_first_line(content)}")
+    
+    # Keep the most recent lines when the summary grows too long
+    summary_lines = []
+    size = 0
+    for line in reversed(lines):
+        size += len(line) + 1
+        if size > SUMMARY_MAX_CHARS:
+            summary_lines.append("- …")
+            break
+        summary_lines.append(line)
+    
+    return "[Résumé de la conversation précédente]\n" + "\n".join(reversed(summary_lines))
+
+
+class HistoryManager:
+    """Builds a bounded Gemini history from the Streamlit chat messages."""
+    
+    def __init__(self, window: int = HISTORY_WINDOW, fold_step: int = HISTORY_FOLD_STEP):
+        """
+        Initialize the history manager.
+        
+        Args:
+            window: Maximum number of recent messages kept verbatim (at least
+                window - fold_step + 1 are kept once the summary kicks in)
+            fold_step: Number of messages folded into the summary at a time
+        """
+        self.window = max(1, window)
+        self.fold_step = max(1, fold_step)
+    
+    def build(self, messages: list[dict]) -> list[dict]:
+        """
+        Convert chat messages into a bounded Gemini history.
+        
+        Recent messages are kept verbatim (minus large payloads), only the most
+        recent full recipe is kept, and older messages become one summary turn.
+        
+        Args:
+            messages: Chat messages ({"role", "content"} dicts), oldest first
+        
+        Returns:
+            list[dict]: Gemini-formatted history ({"role", "parts"} dicts)
+        """
+        overflow = len(messages) - self.window
+        folded = -(-overflow // self.fold_step) * self.fold_step if overflow > 0 else 0
+        older, recent = messages[:folded], messages[folded:]
+        
+        history = []
+        if older:
+            summary = summarize_messages(tuple((m["role"], m["content"]) for m in older))
+            history.append({"role": "user", "parts": [summary]})
+            # Keep roles alternating when the window starts with a user turn
+            if recent and recent[0]["role"] == "user":
+                history.append({"role": "model", "parts": ["Compris."]})
+        
+        latest_recipe = max(
+            (i for i, m in enumerate(recent) if m["role"] != "user" and RECIPE_MARKER in m["content"]),
+            default=None,
+        )
+        
+        for i, msg in enumerate(recent):
+            content = strip_large_payloads(msg["content"])
+            if msg["role"] != "user" and RECIPE_MARKER in content and i != latest_recipe:
+                content = f"[Recette précédente « {_recipe_title(content)} », remplacée par une version plus récente]"
+            role = "user" if msg["role"] == "user" else "model"
+            history.append({"role": role, "parts": [content or "…"]})
+        
+        return history
@@ -5,17 +5,43 @@ Module to encapsulate all cookidoo-api logic for interacting with the Cookidoo p
 """
 
 import os
-from typing import Optional
+from typing import Any, Awaitable, Callable, Optional
+import base64
+import binascii
+import hashlib
+import json
+import secrets
 from dotenv import load_dotenv
 from aiohttp import ClientSession
-from cookidoo_api import Cookidoo, CookidooConfig
-from cookidoo_api.helpers import (
-    get_localization_options,
-)
+from cookidoo_api import Cookidoo, CookidooAuthException, CookidooConfig
+from localization import get_localization
+from schemas import CustomRecipe
 import aiohttp
+import asyncio
 import time
 
 
+# Readiness polling for freshly created recipes (seconds)
+READY_POLL_INITIAL_DELAY = 0.25
+READY_POLL_MAX_DELAY = 2.0
+READY_TIMEOUT = 10.0
+
+# Connection pool and token settings
+CONNECTION_POOL_LIMIT = 20
+DEFAULT_TOKEN_LIFETIME = 3600
+
+# Bulk upload settings
+BATCH_MAX_CONCURRENCY = 4
+BATCH_MAX_RETRIES = 2
+BATCH_RETRY_DELAY = 1.0
+
+# Created recipes listing
+LIST_PAGE_SIZE = 50
+LIST_MAX_PAGE_SIZE = 200
+# Fields the listing may use to timestamp the last change of a recipe
+CHANGE_STAMP_FIELDS = ("modifiedAt", "lastModified", "lastModifiedAt", "updatedAt", "version")
+
+
 def load_cookidoo_credentials() -> tuple[str, str]:
     """
     Load Cookidoo credentials from .env file.
@@ -40,21 +66,43 @@ def load_cookidoo_credentials() -> tuple[str, str]:
     return email, password
 
 
+class CookidooUnauthorizedError(Exception):
+    """Raised when Cookidoo rejects the access token (HTTP 401)."""
+
+
 class CookidooService:
     """Service class for managing Cookidoo API interactions."""
     
-    def __init__(self, email: str, password: str):
+    def __init__(
+        self,
+        email: str,
+        password: str,
+        ready_timeout: float = READY_TIMEOUT,
+        connection_limit: int = CONNECTION_POOL_LIMIT,
+        country: Optional[str] = None,
+        language: Optional[str] = None,
+    ):
         """
         Initialize the Cookidoo service with credentials.
         
         Args:
             email: Cookidoo account email
             password: Cookidoo account password
+            ready_timeout: Max seconds to wait for a created recipe to become editable
+            connection_limit: Size of the service's own connection pool
+            country: Cookidoo country code, e.g. "fr", "de" (default: COOKIDOO_COUNTRY)
+            language: Cookidoo language, e.g. "fr-FR" (default: the country's default)
         """
         self.email = email
         self.password = password
+        self.ready_timeout = ready_timeout
+        self.connection_limit = connection_limit
+        self.country = country
+        self.language = language
         self._api_client: Optional[Cookidoo] = None
         self._session: Optional[ClientSession] = None
+        self._token_expires_at: float = 0.0
+        self._auth_lock = asyncio.Lock()
     
     async def login(self) -> Cookidoo:
         """
@@ -67,17 +115,16 @@ class CookidooService:
             Exception: If authentication fails
         """
         try:
-            # Create aiohttp ClientSession with a timeout
-            self._session = ClientSession(connector=aiohttp.TCPConnector(verify_ssl=False))
-            
+            # Create aiohttp ClientSession backed by a keep-alive connection pool
+            self._session = ClientSession(
+                connector=aiohttp.TCPConnector(verify_ssl=False, limit=self.connection_limit)
+            )
 
-            # Create CookidooConfig with credentials
+            # Create CookidooConfig with credentials and the cached market localization
             config = CookidooConfig(
                 email=self.email,
                 password=self.password,
-                localization=(
-                    await get_localization_options(country="fr", language="fr-FR")
-                )[0],
+                localization=await get_localization(self.country, self.language),
             )
             
             # Create Cookidoo API client with session and config
@@ -85,6 +132,7 @@ class CookidooService:
             
             # Perform login (no parameters needed - uses config)
             await self._api_client.login()
+            self._record_token_expiry()
             
             return self._api_client
             
@@ -94,10 +142,99 @@ class CookidooService:
                 await self._session.close()
             raise Exception(f"Failed to authenticate with Cookidoo: {str(e)}") from e
     
+    async def refresh_token(self) -> None:
+        """
+        Refresh the access token without a full login.
+        
+        Raises:
+            Exception: If not authenticated or if the refresh fails
+        """
+        if not self._api_client:
+            raise Exception("Not authenticated. Please call login() first.")
+        
+        try:
+            await self._api_client.refresh_token()
+            self._record_token_expiry()
+        except Exception as e:
+            raise Exception(f"Failed to refresh Cookidoo token: {str(e)}") from e
+    
+    async def reauthenticate(self, stale_token: Optional[str] = None) -> None:
+        """
+        Renew the access token after it was rejected, once for all concurrent callers.
+        
+        Refreshes the token, falling back to a login on the same session so
+        requests in flight are not interrupted.
+        
+        Args:
+            stale_token: Access token that was rejected; nothing is done if it
+                has already been replaced by another caller
+            
+        Raises:
+            Exception: If both the refresh and the login fail
+        """
+        async with self._auth_lock:
+            if stale_token and self._access_token() != stale_token:
+                return
+            try:
+                await self.refresh_token()
+            except Exception:
+                if not self._api_client:
+                    raise
+                await self._api_client.login()
+                self._record_token_expiry()
+    
+    async def _with_reauth(self, operation: Callable[[], Awaitable[Any]]) -> Any:
+        """Run an authenticated request, renewing the token and retrying once on a 401."""
+        token = self._access_token()
+        try:
+            return await operation()
+        except (CookidooAuthException, CookidooUnauthorizedError):
+            await self.reauthenticate(token)
+            return await operation()
+    
+    def _access_token(self) -> Optional[str]:
+        """Current access token, if authenticated."""
+        auth_data = self._api_client.auth_data if self._api_client else None
+        return getattr(auth_data, "access_token", None)
+    
+    def _auth_headers(self) -> dict[str, str]:
+        """Headers for the undocumented API, with the current bearer token."""
+        return {
+            "Accept": "application/json",
+            "Content-Type": "application/json",
+            "Authorization": f"Bearer {self._access_token()}"
+        }
+    
+    async def get_recipe_details(self, recipe_id: str):
+        """
+        Fetch a recipe, renewing the access token once if it was rejected.
+        
+        Args:
+            recipe_id: Cookidoo recipe ID
+            
+        Returns:
+            CookidooRecipeDetails: The recipe details from cookidoo-api
+        """
+        if not self._api_client:
+            raise Exception("Not authenticated. Please call login() first.")
+        return await self._with_reauth(lambda: self._api_client.get_recipe_details(recipe_id))
+    
+    def token_expires_within(self, seconds: float) -> bool:
+        """Check whether the access token expires in the next `seconds` seconds."""
+        return time.monotonic() + seconds >= self._token_expires_at
+    
+    def _record_token_expiry(self) -> None:
+        """Store the token expiry deadline from the current auth data."""
+        auth_data = self._api_client.auth_data if self._api_client else None
+        expires_in = getattr(auth_data, "expires_in", None) or DEFAULT_TOKEN_LIFETIME
+        self._token_expires_at = time.monotonic() + int(expires_in)
+    
     async def close(self) -> None:
         """Close the aiohttp session."""
         if self._session:
             await self._session.close()
+        self._session = None
+        self._api_client = None
     
     async def create_custom_recipe(
         self,
@@ -127,87 +264,500 @@ class CookidooService:
         Raises:
             Exception: If recipe creation fails
         """
+        try:
+            # Step 1: Create the recipe with just the name
+            recipe_id = await self._post_recipe(name)
+            
+            # Step 2: Update recipe with ingredients
+            await self._fill_recipe(recipe_id, name, ingredients, steps, servings, prep_time, total_time, hints)
+            
+            return recipe_id
+            
+        except Exception as e:
+            raise Exception(f"Failed to create custom recipe: {str(e)}") from e
+    
+    async def _post_recipe(self, name: str) -> str:
+        """Create an empty recipe holding only its name and return its ID."""
+        if not self._api_client or not self._session:
+            raise Exception("Not authenticated. Please call login() first.")
+        
+        # Make sure the client holds an access token
+        auth_data = self._api_client.auth_data
+        if not auth_data:
+            raise Exception("No authentication data available")
+        
+        # Use the API client's session to ensure cookies are shared
+        api_session = self._api_client._session
+        create_url = self._created_recipes_url()
+        return await self._with_reauth(
+            lambda: self._create_recipe(api_session, create_url, name)
+        )
+    
+    async def _fill_recipe(
+        self,
+        recipe_id: str,
+        name: str,
+        ingredients: list[str],
+        steps: list[str],
+        servings: int,
+        prep_time: int,
+        total_time: int,
+        hints: Optional[list[str]],
+    ) -> None:
+        """Wait for a freshly created recipe and PATCH its full content."""
+        api_session = self._api_client._session
+        update_url = self._created_recipes_url(recipe_id)
+        update_data = self._recipe_payload(name, ingredients, steps, servings, prep_time, total_time, hints)
+        
+        await self._with_reauth(
+            lambda: self._wait_until_ready(api_session, update_url)
+        )
+        
+        # Only the wait and the PATCH are retried after a 401, so the recipe is never created twice
+        await self._with_reauth(
+            lambda: self._update_recipe(api_session, update_url, update_data)
+        )
+    
+    async def update_custom_recipe(
+        self,
+        recipe_id: str,
+        name: str,
+        ingredients: list[str],
+        steps: list[str],
+        servings: int = 4,
+        prep_time: int = 30,
+        total_time: int = 60,
+        hints: Optional[list[str]] = None,
+    ) -> None:
+        """
+        Replace the content of an existing custom recipe in place.
+        
+        Args:
+            recipe_id: ID of the created recipe to update
+            name: Recipe name
+            ingredients: List of ingredient descriptions
+            steps: List of cooking step descriptions
+            servings: Number of servings (default: 4)
+            prep_time: Preparation time in minutes (default: 30)
+            total_time: Total cooking time in minutes (default: 60)
+            hints: Optional list of hints/tips for the recipe
+        
+        Raises:
+            Exception: If the recipe does not exist or the update fails
+        """
         if not self._api_client or not self._session:
             raise Exception("Not authenticated. Please call login() first.")
         
+        api_session = self._api_client._session
+        update_url = self._created_recipes_url(recipe_id)
+        update_data = self._recipe_payload(name, ingredients, steps, servings, prep_time, total_time, hints)
+        
         try:
-            # Get the access token from the authenticated client
-            auth_data = self._api_client.auth_data
-            if not auth_data:
-                raise Exception("No authentication data available")
-            
-            localization = self._api_client.localization
-            # Extract base domain from the URL (e.g., "https://cookidoo.fr/foundation/fr-FR" -> "https://cookidoo.fr")
-            url_parts = localization.url.split("/")
-            base_url = f"{url_parts[0]}//{url_parts[2]}"  # protocol + domain
-            locale = localization.language 
-            
-            # Headers for the undocumented API
-            headers = {
-                "Accept": "application/json",
-                "Content-Type": "application/json",
-                "Authorization": f"Bearer {self._api_client.auth_data.access_token}"
+            await self._with_reauth(
+                lambda: self._update_recipe(api_session, update_url, update_data)
+            )
+        except Exception as e:
+            raise Exception(f"Failed to update custom recipe {recipe_id}: {str(e)}") from e
+    
+    async def delete_custom_recipe(self, recipe_id: str) -> bool:
+        """
+        Delete a custom recipe.
+        
+        Args:
+            recipe_id: ID of the created recipe to delete
+        
+        Returns:
+            bool: True if the recipe was deleted, False if it did not exist
+        
+        Raises:
+            Exception: If the deletion fails
+        """
+        if not self._api_client or not self._session:
+            raise Exception("Not authenticated. Please call login() first.")
+        
+        api_session = self._api_client._session
+        delete_url = self._created_recipes_url(recipe_id)
+        
+        async def delete() -> bool:
+            async with api_session.delete(delete_url, headers=self._auth_headers()) as response:
+                if response.status == 401:
+                    raise CookidooUnauthorizedError("Access token rejected while deleting the recipe")
+                if response.status == 404:
+                    return False
+                if response.status not in [200, 202, 204]:
+                    error_text = await response.text()
+                    raise Exception(
+                        f"Failed to delete recipe {recipe_id}. Status: {response.status}, Error: {error_text}"
+                    )
+                return True
+        
+        return await self._with_reauth(delete)
+    
+    async def delete_custom_recipes(
+        self,
+        recipe_ids: list[str],
+        max_concurrency: int = BATCH_MAX_CONCURRENCY,
+    ) -> list[dict]:
+        """
+        Delete many custom recipes concurrently over the authenticated session.
+        
+        Args:
+            recipe_ids: IDs of the created recipes to delete
+            max_concurrency: Maximum number of deletions in flight at once
+        
+        Returns:
+            list[dict]: One result per ID, in input order, with keys
+                "recipe_id", "deleted" (False if the recipe did not exist) and "error"
+        """
+        semaphore = asyncio.Semaphore(max(1, max_concurrency))
+        
+        async def delete(recipe_id: str) -> dict:
+            result = {"recipe_id": recipe_id, "deleted": False, "error": None}
+            try:
+                async with semaphore:
+                    result["deleted"] = await self.delete_custom_recipe(recipe_id)
+            except Exception as e:
+                result["error"] = str(e)
+            return result
+        
+        # Duplicated IDs are deleted once
+        return await asyncio.gather(*(delete(recipe_id) for recipe_id in dict.fromkeys(recipe_ids)))
+    
+    async def list_created_recipes(
+        self,
+        cursor: Optional[str] = None,
+        page_size: int = LIST_PAGE_SIZE,
+    ) -> dict:
+        """
+        List one page of the account's created recipes ("Mes Créations").
+        
+        Cookidoo has no change feed: every page is fetched in full. Each entry
+        carries a change stamp (the modification date reported by Cookidoo, or
+        a hash of the entry when the listing has none) so callers can compare
+        it with the stamps they recorded and only process changed recipes.
+        
+        The cursor is opaque. It pins the page size and a snapshot marker for
+        the whole walk; a walk whose library changed size meanwhile, which
+        would make offset paging skip or repeat entries, is rejected.
+        
+        Args:
+            cursor: Cursor returned with the previous page (None for the first page)
+            page_size: Number of recipes per page (capped at LIST_MAX_PAGE_SIZE),
+                ignored when a cursor is given
+        
+        Returns:
+            dict: "recipes" (list of dicts with "recipe_id", "name" and
+                "change_stamp"), "next_cursor" (None on the last page),
+                "snapshot" (identifier of the walk, shared by all its pages)
+                and "complete" (True on the last page of a walk known to have
+                covered the whole library)
+        
+        Raises:
+            ValueError: If the cursor is malformed or the library changed
+                during the walk (start again without a cursor)
+            Exception: If the listing fails
+        """
+        if not self._api_client or not self._session:
+            raise Exception("Not authenticated. Please call login() first.")
+        
+        api_session = self._api_client._session
+        list_url = self._created_recipes_url()
+        if cursor:
+            state = self._decode_cursor(cursor)
+        else:
+            state = {
+                "page": 0,
+                "size": min(max(page_size, 1), LIST_MAX_PAGE_SIZE),
+                "snapshot": secrets.token_hex(6),
+                "total": None,
+                "previous": None,
             }
-            
-            # Use the API client's session to ensure cookies are shared
-            api_session = self._api_client._session
+        page, size = state["page"], state["size"]
         
-            
-            # Step 1: Create the recipe with just the name
-            create_url = f"{base_url}/created-recipes/{locale}"
-            create_data = {"recipeName": name}
-            
-            async with api_session.post(
-                create_url, json=create_data, headers=headers
+        async def fetch() -> Any:
+            async with api_session.get(
+                list_url, params={"page": page, "size": size}, headers=self._auth_headers()
             ) as response:
+                if response.status == 401:
+                    raise CookidooUnauthorizedError("Access token rejected while listing the recipes")
                 if response.status != 200:
                     error_text = await response.text()
                     raise Exception(
-                        f"Failed to create recipe. Status: {response.status}, Error: {error_text}"
+                        f"Failed to list created recipes. Status: {response.status}, Error: {error_text}"
                     )
-                
-                result = await response.json()
-                recipe_id = result.get("recipeId")
-                
-                if not recipe_id:
-                    raise Exception("No recipe ID returned from creation")
+                return await response.json()
+        
+        try:
+            data = await self._with_reauth(fetch)
+        except Exception as e:
+            raise Exception(f"Failed to list created recipes: {str(e)}") from e
+        
+        # Paged responses wrap the entries; accept a bare list too
+        if isinstance(data, list):
+            items, total_pages, total = data, None, None
+        else:
+            items = next(
+                (data[key] for key in ("content", "recipes", "items", "data") if isinstance(data.get(key), list)),
+                [],
+            )
+            paging = data.get("page") if isinstance(data.get("page"), dict) else {}
+            total_pages = data.get("totalPages", paging.get("totalPages"))
+            total = data.get("totalElements", paging.get("totalElements"))
+        
+        if page and total is not None and state["total"] is not None and total != state["total"]:
+            raise ValueError(
+                "The recipe library changed during the listing; start again without a cursor."
+            )
+        
+        recipes = [self._recipe_summary(item) for item in items if isinstance(item, dict)]
+        recipes = [recipe for recipe in recipes if recipe["recipe_id"]]
+        page_hash = hashlib.sha256(
+            "\n".join(recipe["recipe_id"] for recipe in recipes).encode("utf-8")
+        ).hexdigest()[:16]
+        
+        if page and page_hash == state["previous"]:
+            # The endpoint ignored the page parameter: this page was already listed
+            recipes, has_more, complete = [], False, False
+        else:
+            if total_pages is not None:
+                has_more = bool(recipes) and page + 1 < total_pages
+            else:
+                # No page count: a full page may be followed by another, a short one is the last
+                has_more = len(items) == size
+            complete = not has_more
+        
+        next_cursor = None
+        if has_more:
+            next_cursor = self._encode_cursor(
+                {**state, "page": page + 1, "total": total if total is not None else state["total"], "previous": page_hash}
+            )
+        
+        return {
+            "recipes": recipes,
+            "next_cursor": next_cursor,
+            "snapshot": state["snapshot"],
+            "complete": complete,
+        }
+    
+    @staticmethod
+    def _encode_cursor(state: dict) -> str:
+        """Serialize the paging state into an opaque cursor."""
+        return base64.urlsafe_b64encode(json.dumps(state, separators=(",", ":")).encode("utf-8")).decode("ascii")
+    
+    @staticmethod
+    def _decode_cursor(cursor: str) -> dict:
+        """Parse a cursor built by _encode_cursor, rejecting malformed ones."""
+        try:
+            state = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+            if not (
+                isinstance(state, dict)
+                and isinstance(state.get("page"), int) and state["page"] > 0
+                and isinstance(state.get("size"), int) and 1 <= state["size"] <= LIST_MAX_PAGE_SIZE
+                and isinstance(state.get("snapshot"), str)
+            ):
+                raise ValueError("unexpected content")
+        except (ValueError, UnicodeError, binascii.Error) as e:
+            raise ValueError(
+                "Invalid cursor: pass the next_cursor value returned by the previous listing, "
+                "or no cursor to start from the first page."
+            ) from e
+        state.setdefault("total", None)
+        state.setdefault("previous", None)
+        return state
+    
+    @staticmethod
+    def _recipe_summary(item: dict) -> dict:
+        """Reduce a created-recipe listing entry to its ID, name and change stamp."""
+        content = item.get("recipeContent") if isinstance(item.get("recipeContent"), dict) else item
+        stamp = next((item[field] for field in CHANGE_STAMP_FIELDS if item.get(field) is not None), None)
+        if stamp is None:
+            stamp = hashlib.sha256(json.dumps(item, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+        
+        return {
+            "recipe_id": item.get("recipeId") or item.get("id"),
+            "name": content.get("name") or item.get("recipeName") or "",
+            "change_stamp": str(stamp),
+        }
+    
+    def _created_recipes_url(self, recipe_id: Optional[str] = None) -> str:
+        """URL of the created recipes collection, or of one created recipe."""
+        localization = self._api_client.localization
+        # Extract base domain from the URL (e.g., "https://cookidoo.fr/foundation/fr-FR" -> "https://cookidoo.fr")
+        url_parts = localization.url.split("/")
+        base_url = f"{url_parts[0]}//{url_parts[2]}"  # protocol + domain
+        url = f"{base_url}/created-recipes/{localization.language}"
+        return f"{url}/{recipe_id}" if recipe_id else url
+    
+    @staticmethod
+    def _recipe_payload(
+        name: str,
+        ingredients: list[str],
+        steps: list[str],
+        servings: int,
+        prep_time: int,
+        total_time: int,
+        hints: Optional[list[str]],
+    ) -> dict:
+        """Build the PATCH body of a created recipe."""
+        # PATCH requires a complete recipe structure with ALL required fields
+        return {
+            "name": name,
+            "image": None,  # Can be null or match pattern: ^((prod|nonprod)/img/customer-recipe/)?[A-Za-z0-9-_]{1,}.(bmp|jpe|jpeg|jpg|png)$
+            "isImageOwnedByUser": False,
+            "tools": ["TM6"],
+            "yield": {"value": servings, "unitText": "portion"},
+            "prepTime": prep_time * 60,  # Convert minutes to seconds
+            "cookTime": 0,
+            "totalTime": total_time * 60,  # Convert minutes to seconds
+            "ingredients": [{"type": "INGREDIENT", "text": ing} for ing in ingredients],
+            "instructions": [{"type": "STEP", "text": step} for step in steps],
+            "hints": "\n".join(hints) if hints and isinstance(hints, list) else (hints if hints else ""),
+            "workStatus": "PRIVATE",
+            "recipeMetadata": {
+                "requiresAnnotationsCheck": True
+            }
+        }
+    
+    async def create_custom_recipes(
+        self,
+        recipes: list[CustomRecipe],
+        max_concurrency: int = BATCH_MAX_CONCURRENCY,
+        max_retries: int = BATCH_MAX_RETRIES,
+    ) -> list[dict]:
+        """
+        Create many custom recipes concurrently over the authenticated session.
+        
+        Args:
+            recipes: Validated recipes to create
+            max_concurrency: Maximum number of uploads in flight at once
+            max_retries: Number of retries for each failed recipe
             
-            # Step 2: Update recipe with ingredients
-            update_url = f"{base_url}/created-recipes/{locale}/{recipe_id}"
-            
-            # PATCH requires a complete recipe structure with ALL required fields
-            update_data = {
-                "name": name,
-                "image": None,  # Can be null or match pattern: ^((prod|nonprod)/img/customer-recipe/)?[A-Za-z0-9-_]{1,}.(bmp|jpe|jpeg|jpg|png)$
-                "isImageOwnedByUser": False,
-                "tools": ["TM6"],
-                "yield": {"value": servings, "unitText": "portion"},
-                "prepTime": prep_time * 60,  # Convert minutes to seconds
-                "cookTime": 0,
-                "totalTime": total_time * 60,  # Convert minutes to seconds
-                "ingredients": [{"type": "INGREDIENT", "text": ing} for ing in ingredients],
-                "instructions": [{"type": "STEP", "text": step} for step in steps],
-                "hints": "\n".join(hints) if hints and isinstance(hints, list) else (hints if hints else ""),
-                "workStatus": "PRIVATE",
-                "recipeMetadata": {
-                    "requiresAnnotationsCheck": True
-                }
+        Returns:
+            list[dict]: One result per recipe, in input order, with keys
+                "name", "success", "recipe_id", "error", "attempts" and
+                "orphan_id" (ID of a half-created recipe that could not be
+                deleted after the last failure, else None)
+        """
+        semaphore = asyncio.Semaphore(max(1, max_concurrency))
+        
+        async def upload(recipe: CustomRecipe) -> dict:
+            result = {
+                "name": recipe.name, "success": False, "recipe_id": None,
+                "error": None, "attempts": 0, "orphan_id": None,
             }
+            recipe_id = None
             
-            time.sleep(5)
-
-            async with api_session.patch(update_url, json=update_data, headers=headers) as response:
-                print(f"  Response Status: {response.status}")
-                response_text = await response.text()
-                print(f"  Response Body: {response_text}")
-                
-                if response.status not in [200, 204]:
-                    raise Exception(f"Failed to update recipe: {response_text}")
+            for attempt in range(max_retries + 1):
+                result["attempts"] = attempt + 1
+                try:
+                    async with semaphore:
+                        # POST only once: retries complete the recipe already created
+                        if recipe_id is None:
+                            recipe_id = await self._post_recipe(recipe.name)
+                        await self._fill_recipe(
+                            recipe_id,
+                            name=recipe.name,
+                            ingredients=recipe.ingredients,
+                            steps=recipe.steps,
+                            servings=recipe.servings,
+                            prep_time=recipe.prep_time,
+                            total_time=recipe.total_time,
+                            hints=recipe.hints,
+                        )
+                    result["recipe_id"] = recipe_id
+                    result["success"] = True
+                    result["error"] = None
+                    break
+                except Exception as e:
+                    result["error"] = str(e)
+                    if attempt < max_retries:
+                        # Back off outside the semaphore so other recipes keep flowing
+                        await asyncio.sleep(BATCH_RETRY_DELAY * 2 ** attempt)
+            
+            if not result["success"] and recipe_id is not None:
+                # Do not leave a recipe holding only its name in "Mes Créations"
+                try:
+                    await self.delete_custom_recipe(recipe_id)
+                except Exception as e:
+                    result["orphan_id"] = recipe_id
+                    result["error"] += f" (incomplete recipe {recipe_id} could not be deleted: {str(e)})"
+            
+            return result
+        
+        return await asyncio.gather(*(upload(recipe) for recipe in recipes))
+    
+    async def _create_recipe(self, api_session: ClientSession, create_url: str, name: str) -> str:
+        """POST a new, empty recipe and return its ID."""
+        async with api_session.post(
+            create_url, json={"recipeName": name}, headers=self._auth_headers()
+        ) as response:
+            if response.status == 401:
+                raise CookidooUnauthorizedError("Access token rejected while creating the recipe")
+            if response.status != 200:
+                error_text = await response.text()
+                raise Exception(
+                    f"Failed to create recipe. Status: {response.status}, Error: {error_text}"
+                )
+            
+            result = await response.json()
+            recipe_id = result.get("recipeId")
+            
+            if not recipe_id:
+                raise Exception("No recipe ID returned from creation")
             
             return recipe_id
+    
+    async def _update_recipe(self, api_session: ClientSession, update_url: str, update_data: dict) -> None:
+        """PATCH the full content of a created recipe."""
+        async with api_session.patch(update_url, json=update_data, headers=self._auth_headers()) as response:
+            if response.status == 401:
+                raise CookidooUnauthorizedError("Access token rejected while updating the recipe")
+            if response.status not in [200, 204]:
+                response_text = await response.text()
+                raise Exception(f"Failed to update recipe. Status: {response.status}, Error: {response_text}")
+    
+    async def _wait_until_ready(
+        self,
+        api_session: ClientSession,
+        recipe_url: str,
+    ) -> bool:
+        """
+        Poll a newly created recipe until the backend serves it.
+        
+        Uses exponential backoff starting at READY_POLL_INITIAL_DELAY and capped
+        at READY_POLL_MAX_DELAY, without blocking the event loop.
+        
+        Args:
+            api_session: Authenticated aiohttp session
+            recipe_url: URL of the created recipe
             
-        except Exception as e:
-            raise Exception(f"Failed to create custom recipe: {str(e)}") from e
+        Returns:
+            bool: True if the recipe became available, False if the timeout was reached
+        
+        Raises:
+            CookidooUnauthorizedError: If the access token is rejected
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.ready_timeout
+        delay = READY_POLL_INITIAL_DELAY
+        
+        while True:
+            try:
+                async with api_session.get(recipe_url, headers=self._auth_headers()) as response:
+                    if response.status == 401:
+                        raise CookidooUnauthorizedError("Access token rejected while waiting for the recipe")
+                    if response.status == 200:
+                        return True
+            except aiohttp.ClientError:
+                pass
+            
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                # Let the PATCH surface the real error if the recipe is still not ready
+                return False
+            
+            await asyncio.sleep(min(delay, remaining))
+            delay = min(delay * 2, READY_POLL_MAX_DELAY)
     
     @property
     def api_client(self) -> Optional[Cookidoo]:
@@ -0,0 +1,639 @@
+"""
+Gemini Service
+
+Module to encapsulate all Gemini (google-generativeai) logic used by the Streamlit app.
+"""
+
+import datetime
+import hashlib
+import json
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Iterator, Optional
+import google.generativeai as genai
+from google.generativeai import caching
+from pydantic import BaseModel, ValidationError
+from cache_store import PersistentCache
+from schemas import CustomRecipe, RecipeAdaptation
+
+
+# Default Gemini model
+GEMINI_MODEL = "gemini-2.5-flash"
+
+# Explicit context caching settings
+CONTEXT_CACHE_TTL = datetime.timedelta(hours=1)
+CONTEXT_CACHE_REFRESH_MARGIN = 300
+CONTEXT_CACHE_MAX_ENTRIES = 32
+# Locks serializing the creation of one prefix (striped: keys share a bounded set)
+CONTEXT_CACHE_LOCK_STRIPES = 16
+HISTORY_CACHE_BLOCK = 8
+
+# Opening fence of the recipe JSON block in model responses
+JSON_FENCE = "```json"
+
+# Fallback message when the model returns no usable text
+EMPTY_RESPONSE_MESSAGE = "Désolé, je n'ai pas pu traiter cette demande."
+
+# JSON schema keywords understood by Gemini's response_schema
+GEMINI_SCHEMA_KEYS = {"type", "format", "description", "nullable", "enum", "items", "properties", "required"}
+
+
+def response_text(response) -> str:
+    """
+    Get the text of a Gemini response, even when `response.text` is unavailable.
+    
+    Args:
+        response: Gemini GenerateContentResponse
+        
+    Returns:
+        str: Concatenated text parts, or EMPTY_RESPONSE_MESSAGE
+    """
+    try:
+        return response.text
+    except Exception:
+        if response.candidates and response.candidates[0].content:
+            text = ""
+            for part in response.candidates[0].content.parts:
+                if hasattr(part, 'text') and part.text:
+                    text += part.text
+            return text if text else EMPTY_RESPONSE_MESSAGE
+    
+    return EMPTY_RESPONSE_MESSAGE
+
+
+def clean_response_for_display(response_text: str) -> str:
+    """Remove JSON block from response for user display."""
+    # Remove JSON code block
+    cleaned = re.sub(r'```json\s*\{.*?\}\s*```', '', response_text, flags=re.DOTALL)
+    # Remove standalone JSON object at the end
+    cleaned = re.sub(r'\n\s*\{"name".*\}\s*$', '', cleaned, flags=re.DOTALL)
+    return cleaned.strip()
+
+
+def extract_recipe_json(response_text: str) -> dict | None:
+    """Extract JSON recipe data from Gemini response and normalize steps."""
+    data = None
+    
+    # Try to find JSON block
+    match = re.search(r'```json\s*(.*?)\s*```', response_text, re.DOTALL)
+    if match:
+        try:
+            data = json.loads(match.group(1))
+        except json.JSONDecodeError:
+            pass
+    
+    # Try to find raw JSON object
+    if not data:
+        match = re.search(r'\{[^{}]*"name"[^{}]*\}', response_text, re.DOTALL)
+        if match:
+            try:
+                data = json.loads(match.group(0))
+            except json.JSONDecodeError:
+                pass
+    
+    if not data:
+        return None
+    
+    # Normalize steps: if they are dicts, convert to plain text strings
+    if "steps" in data and isinstance(data["steps"], list):
+        normalized_steps = []
+        for step in data["steps"]:
+            if isinstance(step, dict):
+                # Extract description and combine with time/temp/speed if present
+                desc = step.get("description", step.get("text", ""))
+                time_val = step.get("time", "")
+                temp = step.get("temperature", "")
+                speed = step.get("speed", "")
+                # Build step text: "description. time / temp / speed"
+                parts = [desc]
+                if time_val and time_val != "0":
+                    details = [time_val]
+                    if temp and temp != "0°C":
+                        details.append(temp)
+                    if speed and speed != "Manuel":
+                        details.append(speed)
+                    if details:
+                        parts.append(" / ".join(details))
+                normalized_steps.append(". ".join(parts) if len(parts) > 1 else desc)
+            else:
+                normalized_steps.append(str(step))
+        data["steps"] = normalized_steps
+    
+    # Normalize ingredients: if they are dicts, extract text
+    if "ingredients" in data and isinstance(data["ingredients"], list):
+        normalized_ingredients = []
+        for ing in data["ingredients"]:
+            if isinstance(ing, dict):
+                # Extract text from dict
+                text = ing.get("text", ing.get("name", ing.get("ingredient", "")))
+                quantity = ing.get("quantity", ing.get("amount", ""))
+                if quantity and text:
+                    normalized_ingredients.append(f"{quantity} {text}")
+                elif text:
+                    normalized_ingredients.append(text)
+            else:
+                normalized_ingredients.append(str(ing))
+        data["ingredients"] = normalized_ingredients
+    
+    return data
+
+
+def gemini_schema(model: type[BaseModel]) -> dict:
+    """
+    Convert a Pydantic model into a Gemini response_schema.
+    
+    References are inlined, Optional fields become nullable and keywords
+    Gemini does not support (titles, defaults, bounds, examples) are dropped.
+    
+    Args:
+        model: Pydantic model describing the expected response
+        
+    Returns:
+        dict: OpenAPI-style schema accepted by GenerationConfig.response_schema
+    """
+    schema = model.model_json_schema()
+    defs = schema.pop("$defs", {})
+    
+    def convert(node: dict) -> dict:
+        if "$ref" in node:
+            return convert({**defs[node["$ref"].split("/")[-1]], **{k: v for k, v in node.items() if k != "$ref"}})
+        
+        if "anyOf" in node:
+            options = [option for option in node["anyOf"] if option.get("type") != "null"]
+            converted = convert({**options[0], **{k: v for k, v in node.items() if k != "anyOf"}})
+            if len(options) < len(node["anyOf"]):
+                converted["nullable"] = True
+            return converted
+        
+        converted = {key: value for key, value in node.items() if key in GEMINI_SCHEMA_KEYS}
+        if "properties" in node:
+            converted["properties"] = {name: convert(prop) for name, prop in node["properties"].items()}
+        if "items" in node:
+            converted["items"] = convert(node["items"])
+        return converted
+    
+    return convert(schema)
+
+
+def _clamp_to_bounds(recipe: dict) -> dict:
+    """Clamp numeric recipe fields into the CustomRecipe bounds, which response_schema cannot express."""
+    recipe = dict(recipe)
+    for name, field in CustomRecipe.model_fields.items():
+        value = recipe.get(name)
+        if not isinstance(value, (int, float)) or isinstance(value, bool):
+            continue
+        for constraint in field.metadata:
+            if getattr(constraint, "ge", None) is not None:
+                value = max(value, constraint.ge)
+            if getattr(constraint, "le", None) is not None:
+                value = min(value, constraint.le)
+        recipe[name] = int(value)
+    return recipe
+
+
+def parse_adaptation(text: str) -> RecipeAdaptation:
+    """
+    Parse a structured-output response.
+    
+    Out-of-range times and servings are clamped; a recipe that still does not
+    validate is dropped rather than failing the whole response, so the display
+    text is always kept.
+    
+    Args:
+        text: Response text, a RecipeAdaptation JSON document
+        
+    Returns:
+        RecipeAdaptation: Display text and optional recipe
+    """
+    try:
+        data = json.loads(text)
+    except json.JSONDecodeError:
+        return RecipeAdaptation(display_text=text)
+    
+    if not isinstance(data, dict):
+        return RecipeAdaptation(display_text=text)
+    
+    recipe = None
+    if isinstance(data.get("recipe"), dict):
+        try:
+            recipe = CustomRecipe.model_validate(_clamp_to_bounds(data["recipe"]))
+        except ValidationError:
+            pass
+    
+    return RecipeAdaptation(display_text=str(data.get("display_text") or EMPTY_RESPONSE_MESSAGE), recipe=recipe)
+
+
+class StreamingResponseParser:
+    """Splits a streamed response into display text and the trailing JSON recipe block."""
+    
+    def __init__(self):
+        """Initialize an empty parser."""
+        self.text = ""
+        self.recipe: Optional[dict] = None
+        self._emitted = 0
+    
+    def feed(self, chunk: str) -> str:
+        """
+        Add a streamed chunk.
+        
+        Text up to the ```json fence is released for display; the JSON block is
+        held back and parsed as soon as its closing fence arrives.
+        
+        Args:
+            chunk: New text from the model
+            
+        Returns:
+            str: Newly displayable text (may be empty)
+        """
+        self.text += chunk
+        
+        start = self.text.find(JSON_FENCE)
+        if start == -1:
+            # Hold back a trailing partial fence such as "``" or "```js"
+            safe_end = len(self.text) - self._partial_fence_length()
+        else:
+            safe_end = start
+            if self.recipe is None:
+                end = self.text.find("```", start + len(JSON_FENCE))
+                if end != -1:
+                    self.recipe = extract_recipe_json(self.text[start:end + 3])
+        
+        if safe_end <= self._emitted:
+            return ""
+        
+        delta = self.text[self._emitted:safe_end]
+        self._emitted = safe_end
+        return delta
+    
+    def finish(self) -> str:
+        """
+        Flush the end of the stream.
+        
+        Returns:
+            str: Remaining displayable text after the JSON block, if any
+        """
+        if self.recipe is None:
+            self.recipe = extract_recipe_json(self.text)
+        
+        if JSON_FENCE not in self.text:
+            delta = self.text[self._emitted:]
+            self._emitted = len(self.text)
+            return delta
+        
+        # Only text following the JSON block is left to show
+        displayed = clean_response_for_display(self.text)
+        shown = self.text[:self.text.find(JSON_FENCE)].strip()
+        return displayed[len(shown):] if displayed.startswith(shown) else ""
+    
+    def _partial_fence_length(self) -> int:
+        """Length of the longest suffix of the text that could start a JSON fence."""
+        for length in range(min(len(JSON_FENCE) - 1, len(self.text)), 0, -1):
+            if JSON_FENCE.startswith(self.text[-length:]):
+                return length
+        return 0
+
+
+class ContextCacheManager:
+    """Creates, reuses and expires Gemini cached contents for the system prompt and history prefixes."""
+    
+    def __init__(
+        self,
+        model_name: str,
+        system_instruction: str,
+        ttl: datetime.timedelta = CONTEXT_CACHE_TTL,
+        history_block: int = HISTORY_CACHE_BLOCK,
+        max_entries: int = CONTEXT_CACHE_MAX_ENTRIES,
+        generation_config: Optional[dict[str, Any]] = None,
+    ):
+        """
+        Initialize the cache manager.
+        
+        Args:
+            model_name: Gemini model the cached contents are created for
+            system_instruction: System prompt stored in every cached content
+            ttl: Lifetime of a cached content, extended while it is in use
+            history_block: History is cached in prefixes of whole blocks of this
+                many messages, so a cached prefix stays valid for several turns
+            max_entries: Maximum number of live cached contents; the least
+                recently used one is deleted beyond that
+            generation_config: Generation config of the models bound to the
+                cached contents
+        """
+        self.model_name = model_name
+        self.system_instruction = system_instruction
+        self.ttl = ttl
+        self.history_block = max(2, history_block)
+        self.max_entries = max_entries
+        self.generation_config = generation_config
+        self._entries: OrderedDict[str, tuple[caching.CachedContent, float]] = OrderedDict()
+        self._uncacheable: dict[str, float] = {}
+        # _lock guards the dicts only; network calls run under the key's stripe lock
+        self._lock = threading.Lock()
+        self._key_locks = [threading.Lock() for _ in range(CONTEXT_CACHE_LOCK_STRIPES)]
+    
+    def get_model(self, history: list[dict]) -> tuple[Optional[genai.GenerativeModel], list[dict]]:
+        """
+        Return a model bound to the longest cached prefix of `history`.
+        
+        Tries the largest whole-block prefix first, then the system prompt alone.
+        
+        Args:
+            history: Gemini-formatted history ({"role", "parts"} dicts)
+            
+        Returns:
+            tuple: (model, remaining history to send), or (None, history) if
+                nothing could be cached, e.g. below the minimum token count
+        """
+        prefix_len = len(history) - len(history) % self.history_block
+        
+        for length in dict.fromkeys((prefix_len, 0)):
+            cached = self._get_or_create(history[:length])
+            if cached is not None:
+                return genai.GenerativeModel.from_cached_content(
+                    cached_content=cached,
+                    generation_config=self.generation_config,
+                ), history[length:]
+        
+        return None, history
+    
+    def _key(self, prefix: list[dict]) -> str:
+        """Content hash identifying a model, system prompt and history prefix."""
+        payload = json.dumps([self.model_name, self.system_instruction, prefix], ensure_ascii=False, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+    
+    def _get_or_create(self, prefix: list[dict]) -> Optional[caching.CachedContent]:
+        """Reuse, extend or create the cached content for `prefix`."""
+        key = self._key(prefix)
+        
+        # Fast path: a live entry needs no network call
+        cached = self._lookup(key)
+        if cached is not None or self._is_uncacheable(key):
+            return cached
+            
+        # Only callers of the same prefix wait here; other sessions proceed
+        with self._key_locks[int(key[:8], 16) % len(self._key_locks)]:
+            # Another caller may have created or refreshed it meanwhile
+            cached = self._lookup(key)
+            if cached is not None or self._is_uncacheable(key):
+                return cached
+            
+            now = time.time()
+            ttl_seconds = self.ttl.total_seconds()
+            with self._lock:
+                entry = self._entries.get(key)
+            
+            if entry is not None:
+                try:
+                    entry[0].update(ttl=self.ttl)
+                    with self._lock:
+                        self._entries[key] = (entry[0], now + ttl_seconds)
+                        self._entries.move_to_end(key)
+                    return entry[0]
+                except Exception:
+                    # Already expired on the server: recreate it below
+                    with self._lock:
+                        self._entries.pop(key, None)
+            
+            try:
+                cached = caching.CachedContent.create(
+                    model=self.model_name,
+                    display_name=f"cookidoo-{key[:16]}",
+                    system_instruction=self.system_instruction,
+                    contents=prefix or None,
+                    ttl=self.ttl,
+                )
+            except Exception:
+                # Typically below the minimum cacheable token count: retry after one TTL
+                with self._lock:
+                    self._uncacheable[key] = now + ttl_seconds
+                return None
+            
+            evicted = []
+            with self._lock:
+                self._entries[key] = (cached, now + ttl_seconds)
+                while len(self._entries) > self.max_entries:
+                    evicted.append(self._entries.popitem(last=False)[1][0])
+            
+        for old in evicted:
+            self._delete(old)
+        return cached
+    
+    def _lookup(self, key: str) -> Optional[caching.CachedContent]:
+        """Return the entry for `key` if it does not need a TTL extension yet."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[1] - time.time() <= CONTEXT_CACHE_REFRESH_MARGIN:
+                return None
+            self._entries.move_to_end(key)
+            return entry[0]
+    
+    def _is_uncacheable(self, key: str) -> bool:
+        """Whether creating `key` failed recently; expired markers are dropped."""
+        now = time.time()
+        with self._lock:
+            for expired in [k for k, until in self._uncacheable.items() if until <= now]:
+                del self._uncacheable[expired]
+            return key in self._uncacheable
+    
+    def clear(self) -> None:
+        """Delete every cached content created by this manager."""
+        with self._lock:
+            entries = [cached for cached, _ in self._entries.values()]
+            self._entries.clear()
+        for cached in entries:
+            self._delete(cached)
+    
+    @staticmethod
+    def _delete(cached: caching.CachedContent) -> None:
+        """Delete a cached content, ignoring already expired ones."""
+        try:
+            cached.delete()
+        except Exception:
+            pass
+
+
+class GeminiService:
+    """Service class holding one configured Gemini client and model per process."""
+    
+    def __init__(
+        self,
+        api_key: str,
+        system_instruction: str,
+        model_name: str = GEMINI_MODEL,
+        context_caching: bool = True,
+        response_cache: Optional[PersistentCache] = None,
+        structured_output: bool = False,
+    ):
+        """
+        Configure the Gemini client and build the model once.
+        
+        Args:
+            api_key: Gemini API key
+            system_instruction: System prompt used for every request
+            model_name: Gemini model name (default: GEMINI_MODEL)
+            context_caching: Serve the system prompt and stable history
+                prefixes from Gemini explicit context caches
+            response_cache: Optional cache of complete responses, keyed on the
+                prompt version, model, history and message
+            structured_output: Answer in JSON mode with the RecipeAdaptation
+                schema instead of free text with an embedded JSON block
+        """
+        genai.configure(api_key=api_key)
+        
+        self.model_name = model_name
+        self.system_instruction = system_instruction
+        self.structured_output = structured_output
+        self.generation_config = (
+            {"response_mime_type": "application/json", "response_schema": gemini_schema(RecipeAdaptation)}
+            if structured_output else None
+        )
+        self.model = genai.GenerativeModel(
+            model_name=model_name,
+            system_instruction=system_instruction,
+            generation_config=self.generation_config,
+        )
+        self.context_cache = (
+            ContextCacheManager(model_name, system_instruction, generation_config=self.generation_config)
+            if context_caching else None
+        )
+        self.response_cache = response_cache
+        version = json.dumps([system_instruction, self.generation_config], ensure_ascii=False, sort_keys=True)
+        self.prompt_version = hashlib.sha256(version.encode("utf-8")).hexdigest()[:16]
+    
+    def response_cache_key(self, history: list[dict], message: str) -> str:
+        """
+        Content address of a chat turn.
+        
+        Args:
+            history: Gemini-formatted history
+            message: Enriched user message
+            
+        Returns:
+            str: SHA-256 of the prompt version, model name, history and message
+        """
+        payload = json.dumps(
+            [self.prompt_version, self.model_name, history, message],
+            ensure_ascii=False,
+            default=str,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+    
+    def _store_response(self, key: str, text: str) -> None:
+        """Cache a complete, non-empty response."""
+        if self.response_cache is not None and text and text != EMPTY_RESPONSE_MESSAGE:
+            self.response_cache.set(key, text)
+    
+    def _model_for(self, history: list[dict]) -> tuple[genai.GenerativeModel, list[dict]]:
+        """Pick the cached-content model covering `history`, or the plain model."""
+        if self.context_cache:
+            model, remaining = self.context_cache.get_model(history)
+            if model is not None:
+                return model, remaining
+        return self.model, history
+    
+    def warm_up(self, history: list[dict], message: Optional[str] = None) -> None:
+        """
+        Prepare the model for a request on top of `history` ahead of time.
+        
+        Creates (or refreshes) the context cache covering the history prefix,
+        so it can overlap other work such as scraping a page. Nothing is
+        created when the response to `message` is already cached, since the
+        request will then not reach the model.
+        
+        Args:
+            history: Gemini-formatted history ({"role", "parts"} dicts)
+            message: Message about to be sent, if already known
+        """
+        if message is not None and self.response_cache is not None:
+            if self.response_cache.get(self.response_cache_key(history, message)) is not None:
+                return
+        self._model_for(history)
+    
+    def send_message(self, history: list[dict], message: str) -> str:
+        """
+        Send a chat message on top of an existing conversation.
+        
+        Args:
+            history: Gemini-formatted history ({"role", "parts"} dicts)
+            message: Message to send
+            
+        Returns:
+            str: The model response text
+        """
+        key = self.response_cache_key(history, message)
+        if self.response_cache is not None:
+            cached = self.response_cache.get(key)
+            if cached is not None:
+                return cached
+        
+        model, remaining = self._model_for(history)
+        chat = model.start_chat(history=remaining)
+        text = response_text(chat.send_message(message))
+        self._store_response(key, text)
+        return text
+    
+    def adapt(self, history: list[dict], message: str) -> RecipeAdaptation:
+        """
+        Send a chat message and parse the structured response.
+        
+        Requires structured_output; the recipe comes from JSON mode rather
+        than from regexes over free text.
+        
+        Args:
+            history: Gemini-formatted history ({"role", "parts"} dicts)
+            message: Message to send
+            
+        Returns:
+            RecipeAdaptation: Display text and optional recipe
+        """
+        return parse_adaptation(self.send_message(history, message))
+    
+    def stream_message(self, history: list[dict], message: str) -> Iterator[str]:
+        """
+        Send a chat message and yield the response text as it is generated.
+        
+        Args:
+            history: Gemini-formatted history ({"role", "parts"} dicts)
+            message: Message to send
+            
+        Yields:
+            str: Response text chunks
+        """
+        key = self.response_cache_key(history, message)
+        if self.response_cache is not None:
+            cached = self.response_cache.get(key)
+            if cached is not None:
+                yield cached
+                return
+        
+        model, remaining = self._model_for(history)
+        chat = model.start_chat(history=remaining)
+        
+        chunks = []
+        for chunk in chat.send_message(message, stream=True):
+            try:
+                text = chunk.text
+            except Exception:
+                # Chunks without text parts (e.g. finish metadata)
+                continue
+            if text:
+                chunks.append(text)
+                yield text
+        
+        # Only cache responses that were streamed to completion
+        self._store_response(key, "".join(chunks))
+    
+    def generate_content(self, contents: list) -> str:
+        """
+        Run a single-turn generation (e.g. a prompt plus an image).
+        
+        Args:
+            contents: Prompt parts
+            
+        Returns:
+            str: The model response text
+        """
+        model, _ = self._model_for([])
+        return response_text(model.generate_content(contents))
@@ -0,0 +1,151 @@
+"""
+Localization Catalog
+
+Cookidoo localization options (country, language, site URL) loaded once per
+process and cached on disk, stamped with the cookidoo-api version they came from.
+"""
+
+import asyncio
+import os
+from dataclasses import asdict
+from importlib import metadata
+from typing import Optional
+from cookidoo_api import CookidooLocalizationConfig
+from cookidoo_api.helpers import get_localization_options
+from cache_store import PersistentCache, cache_path
+
+
+# Default market, unless COOKIDOO_COUNTRY / COOKIDOO_LANGUAGE are set
+DEFAULT_COUNTRY = "fr"
+DEFAULT_LANGUAGE = "fr-FR"
+
+# The on-disk catalog is kept until cookidoo-api is upgraded
+CATALOG_TTL = 365 * 24 * 3600
+
+
+def default_market() -> tuple[str, Optional[str]]:
+    """
+    Deployment's default market, read from the environment on each call so
+    a .env loaded after this module was imported still applies.
+    
+    DEFAULT_LANGUAGE only applies to DEFAULT_COUNTRY: a deployment setting
+    just COOKIDOO_COUNTRY=de gets no default language, i.e. the country's own.
+    
+    Returns:
+        tuple[str, Optional[str]]: Default country code and language (None
+            to use the country's first language)
+    """
+    country = os.getenv("COOKIDOO_COUNTRY", DEFAULT_COUNTRY)
+    language = os.getenv("COOKIDOO_LANGUAGE")
+    if language is None and country.lower() == DEFAULT_COUNTRY:
+        language = DEFAULT_LANGUAGE
+    return country, language
+
+
+def _catalog_version() -> str:
+    """Version stamp of the catalog: the installed cookidoo-api version."""
+    try:
+        return metadata.version("cookidoo-api")
+    except metadata.PackageNotFoundError:
+        return "unknown"
+
+
+class LocalizationCatalog:
+    """All Cookidoo markets, read from cookidoo-api once and then from memory or disk."""
+    
+    def __init__(self, cache: Optional[PersistentCache] = None):
+        """
+        Initialize the catalog.
+        
+        Args:
+            cache: Disk cache of the catalog (default: "localization" cache file)
+        """
+        self.cache = cache if cache is not None else PersistentCache(
+            cache_path("localization"), ttl=CATALOG_TTL, max_entries=4
+        )
+        self.version = _catalog_version()
+        self._options: Optional[dict[tuple[str, str], CookidooLocalizationConfig]] = None
+        self._lock = asyncio.Lock()
+    
+    async def load(self) -> dict[tuple[str, str], CookidooLocalizationConfig]:
+        """
+        Load the catalog, from memory, then disk, then cookidoo-api.
+        
+        Returns:
+            dict: Localization configs keyed by (country code, language)
+        """
+        if self._options is not None:
+            return self._options
+        
+        async with self._lock:
+            if self._options is None:
+                key = f"catalog:{self.version}"
+                entries = await self.cache.aget(key)
+                if entries is None:
+                    entries = [asdict(option) for option in await get_localization_options()]
+                    await self.cache.aset(key, entries)
+                
+                self._options = {
+                    (entry["country_code"].lower(), entry["language"]): CookidooLocalizationConfig(**entry)
+                    for entry in entries
+                }
+        
+        return self._options
+    
+    async def get(self, country: Optional[str] = None, language: Optional[str] = None) -> CookidooLocalizationConfig:
+        """
+        Select the localization of a market.
+        
+        Args:
+            country: Country code, e.g. "fr", "de", "es" (default: COOKIDOO_COUNTRY)
+            language: Language tag, e.g. "fr-FR" (default: COOKIDOO_LANGUAGE when
+                the country is the default one, else the country's first language)
+            
+        Returns:
+            CookidooLocalizationConfig: The selected localization
+            
+        Raises:
+            ValueError: If the market does not exist
+        """
+        options = await self.load()
+        default_country, default_language = default_market()
+        country = (country or default_country).lower()
+        if language is None and country == default_country.lower():
+            language = default_language
+        
+        if language is not None:
+            option = options.get((country, language))
+            if option is not None:
+                return option
+        else:
+            for (option_country, _), option in options.items():
+                if option_country == country:
+                    return option
+        
+        available = ", ".join(
+            sorted(f"{code}/{tag}" for code, tag in options if code == country)
+        ) or "none"
+        raise ValueError(
+            f"Unknown Cookidoo market {country}/{language}. Languages available for {country}: {available}"
+        )
+
+
+# Process-wide catalog shared by every login
+_catalog: Optional[LocalizationCatalog] = None
+
+
+async def get_localization(country: Optional[str] = None, language: Optional[str] = None) -> CookidooLocalizationConfig:
+    """
+    Select a localization from the shared catalog.
+    
+    Args:
+        country: Country code (default: COOKIDOO_COUNTRY)
+        language: Language tag (default: the country's default language)
+        
+    Returns:
+        CookidooLocalizationConfig: The selected localization
+    """
+    global _catalog
+    if _catalog is None:
+        _catalog = LocalizationCatalog()
+    return await _catalog.get(country, language)
@@ -4,6 +4,7 @@ Recipe Schemas
 Pydantic models for custom recipe data validation.
 """
 
+import math
 from pydantic import BaseModel, Field, ConfigDict
 from typing import Optional
 
@@ -72,3 +73,80 @@ class CustomRecipe(BaseModel):
         default=None,
         description="Optional cooking tips or hints"
     )
+
+
+class RecipeAdaptation(BaseModel):
+    """Structured Gemini response: the text shown to the user and the recipe to upload."""
+    
+    display_text: str = Field(
+        ...,
+        description="Markdown presentation of the adapted recipe (or the conversational answer), without any JSON"
+    )
+    recipe: Optional[CustomRecipe] = Field(
+        default=None,
+        description="The adapted recipe, or null when the response does not contain a complete recipe"
+    )
+
+
+class RecipeIngredient(BaseModel):
+    """Ingredient line of a Cookidoo recipe."""
+    
+    name: str = Field(..., description="Ingredient name")
+    quantity: Optional[str] = Field(default=None, description="Quantity and unit, e.g. \"200 g\"")
+
+
+class RecipeDetails(BaseModel):
+    """Snapshot of a Cookidoo recipe, as returned by get_recipe_details."""
+    
+    id: str = Field(..., description="Cookidoo recipe ID")
+    name: str = Field(..., description="Recipe name")
+    serving_size: Optional[int] = Field(default=None, description="Number of servings")
+    active_time: Optional[int] = Field(default=None, description="Preparation time in seconds")
+    total_time: Optional[int] = Field(default=None, description="Total time in seconds")
+    difficulty: Optional[str] = Field(default=None, description="Difficulty level")
+    ingredients: list[RecipeIngredient] = Field(default_factory=list, description="Ingredients with quantities")
+    steps: list[str] = Field(default_factory=list, description="Cooking steps")
+    notes: list[str] = Field(default_factory=list, description="Hints and additional information")
+    url: Optional[str] = Field(default=None, description="Recipe page URL")
+    
+    def custom_recipe_data(self) -> dict:
+        """
+        Map the recipe onto CustomRecipe fields, without validation.
+        
+        Times are converted to minutes and servings clamped to the CustomRecipe
+        bounds.
+        
+        Returns:
+            dict: CustomRecipe keyword arguments
+        """
+        def minutes(seconds: Optional[int], default: int) -> int:
+            return min(max(math.ceil(seconds / 60), 1), 1440) if seconds else default
+        
+        return {
+            "name": self.name,
+            "ingredients": [
+                f"{ingredient.quantity} {ingredient.name}" if ingredient.quantity else ingredient.name
+                for ingredient in self.ingredients
+            ],
+            "steps": self.steps,
+            "servings": min(max(self.serving_size, 1), 20) if self.serving_size else 4,
+            "prep_time": minutes(self.active_time, 30),
+            "total_time": minutes(self.total_time, 60),
+            "hints": self.notes or None,
+        }
+    
+    def to_custom_recipe(self, **overrides) -> CustomRecipe:
+        """
+        Convert the recipe into a CustomRecipe ready to be remixed and uploaded.
+        
+        Args:
+            **overrides: CustomRecipe fields replacing the converted ones
+                (e.g. steps, when the source recipe has none)
+            
+        Returns:
+            CustomRecipe: The converted recipe
+            
+        Raises:
+            pydantic.ValidationError: If the result is not a valid CustomRecipe
+        """
+        return CustomRecipe(**{**self.custom_recipe_data(), **overrides})
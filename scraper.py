@@ -0,0 +1,450 @@
+"""
+Recipe Scraper
+
+Async, connection-pooled scraping engine shared by the Streamlit app and the MCP server.
+"""
+
+import asyncio
+import json
+import os
+import re
+from collections import OrderedDict
+from typing import Any, Optional, Protocol
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+import httpx
+from bs4 import BeautifulSoup
+from cache_store import PersistentCache, cache_path
+from site_extractors import GENERIC_EXTRACTOR, get_extractor
+
+
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+
+# Connection pool settings
+REQUEST_TIMEOUT = 15.0
+MAX_CONNECTIONS = 50
+MAX_KEEPALIVE_CONNECTIONS = 20
+MAX_CONNECTIONS_PER_HOST = 4
+
+# Number of URLs whose ETag/Last-Modified validators are remembered
+VALIDATOR_CACHE_SIZE = 256
+
+# Precompiled patterns for the JSON-LD fast path
+JSON_LD_PATTERN = re.compile(
+    r'<script\b[^>]*\btype\s*=\s*["\']?application/ld\+json["\']?[^>]*>(.*?)</script\s*>',
+    re.IGNORECASE | re.DOTALL,
+)
+SCRIPT_END = "</script>"
+JSON_LD_WRAPPER_PATTERN = re.compile(r'^\s*(?://\s*)?(?:<!--|<!\[CDATA\[)|(?://\s*)?(?:-->|\]\]>)\s*$')
+DURATION_HOURS_PATTERN = re.compile(r'(\d+)H')
+DURATION_MINUTES_PATTERN = re.compile(r'(\d+)M')
+FIRST_NUMBER_PATTERN = re.compile(r'(\d+)')
+
+# Query parameters that never change the page content
+TRACKING_PARAMS = {"fbclid", "gclid", "dclid", "msclkid", "mc_cid", "mc_eid", "xtor"}
+
+
+class ScrapeCache(Protocol):
+    """Storage backend for scraped recipes (e.g. cache_store.PersistentCache).
+    
+    Accessed from the event loop: implementations must not block it.
+    """
+    
+    async def aget_entry(self, key: str) -> Optional[tuple[Any, bool]]: ...
+    
+    async def aset(self, key: str, value: Any) -> None: ...
+
+
+def normalize_url(url: str) -> str:
+    """
+    Normalize a URL so equivalent links share one cache entry.
+    
+    Lowercases the scheme and host, drops default ports, fragments and
+    tracking parameters, sorts the query string and trims trailing slashes.
+    
+    Args:
+        url: URL to normalize
+        
+    Returns:
+        str: Normalized URL
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    
+    if parts.port and (scheme, parts.port) not in (("http", 80), ("https", 443)):
+        host = f"{host}:{parts.port}"
+    
+    query = urlencode(sorted(
+        (key, value)
+        for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not key.lower().startswith("utm_") and key.lower() not in TRACKING_PARAMS
+    ))
+    path = parts.path.rstrip("/") or "/"
+    
+    return urlunsplit((scheme, host, path, query, ""))
+
+
+def default_scrape_cache() -> PersistentCache:
+    """
+    Build the shared on-disk scrape cache, configured from the environment.
+    
+    Point COOKIDOO_CACHE_DIR at a shared volume to share it between the
+    Streamlit app, the MCP server and other replicas.
+    
+    Returns:
+        PersistentCache: Compressed SQLite-backed cache with stale-while-revalidate
+    """
+    return PersistentCache(
+        cache_path("scrape"),
+        ttl=float(os.getenv("SCRAPE_CACHE_TTL", 24 * 3600)),
+        max_entries=int(os.getenv("SCRAPE_CACHE_SIZE", 5000)),
+        stale_ttl=float(os.getenv("SCRAPE_CACHE_STALE_TTL", 7 * 24 * 3600)),
+        compress=True,
+    )
+
+
+def _empty_result(url: str) -> dict:
+    """Default recipe fields for a page."""
+    return {
+        "name": "",
+        "servings": 4,
+        "total_time": 60,
+        "ingredients": [],
+        "steps": [],
+        "source_url": url
+    }
+
+
+def _is_recipe(node: Any) -> bool:
+    """Check whether a JSON-LD node is typed as a Recipe."""
+    if not isinstance(node, dict):
+        return False
+    node_type = node.get('@type')
+    return node_type == 'Recipe' or (isinstance(node_type, list) and 'Recipe' in node_type)
+
+
+def find_recipe_node(data: Any) -> Optional[dict]:
+    """
+    Locate the Recipe node in a JSON-LD document.
+    
+    Handles a bare Recipe object, top-level arrays and `@graph` containers.
+    
+    Args:
+        data: Decoded JSON-LD document
+        
+    Returns:
+        Optional[dict]: The Recipe node, or None if the document has none
+    """
+    if _is_recipe(data):
+        return data
+    
+    if isinstance(data, list):
+        candidates = data
+    elif isinstance(data, dict) and isinstance(data.get('@graph'), list):
+        candidates = data['@graph']
+    else:
+        return None
+    
+    for item in candidates:
+        recipe = find_recipe_node(item)
+        if recipe:
+            return recipe
+    
+    return None
+
+
+def parse_duration_minutes(value: Any) -> int:
+    """
+    Convert an ISO-8601 duration (e.g. "PT1H30M") to minutes.
+    
+    Args:
+        value: Duration string
+        
+    Returns:
+        int: Duration in minutes, 0 if it could not be parsed
+    """
+    text = str(value)
+    hours = DURATION_HOURS_PATTERN.search(text)
+    minutes = DURATION_MINUTES_PATTERN.search(text)
+    total_mins = 0
+    if hours:
+        total_mins += int(hours.group(1)) * 60
+    if minutes:
+        total_mins += int(minutes.group(1))
+    return total_mins
+
+
+def recipe_from_json_ld(data: dict, url: str) -> dict:
+    """
+    Map a JSON-LD Recipe node to recipe fields.
+    
+    Args:
+        data: Recipe node
+        url: Page URL, stored as the recipe source
+        
+    Returns:
+        dict: Recipe fields
+    """
+    result = _empty_result(url)
+    result['name'] = data.get('name', '')
+    
+    yield_val = data.get('recipeYield')
+    if yield_val:
+        if isinstance(yield_val, list):
+            yield_val = yield_val[0]
+        match = FIRST_NUMBER_PATTERN.search(str(yield_val))
+        if match:
+            result['servings'] = int(match.group(1))
+    
+    total_time = data.get('totalTime') or data.get('cookTime')
+    if total_time:
+        total_mins = parse_duration_minutes(total_time)
+        if total_mins > 0:
+            result['total_time'] = total_mins
+    
+    ingredients = data.get('recipeIngredient', [])
+    if isinstance(ingredients, list):
+        result['ingredients'] = [str(ing).strip() for ing in ingredients if ing]
+    
+    instructions = data.get('recipeInstructions', [])
+    if isinstance(instructions, str):
+        instructions = [instructions]
+    if isinstance(instructions, list):
+        for step in instructions:
+            if isinstance(step, str):
+                result['steps'].append(step.strip())
+            elif isinstance(step, dict) and isinstance(step.get('itemListElement'), list):
+                # HowToSection: flatten its steps
+                for item in step['itemListElement']:
+                    text = (item.get('text') or item.get('name', '')) if isinstance(item, dict) else item
+                    if text:
+                        result['steps'].append(str(text).strip())
+            elif isinstance(step, dict):
+                text = step.get('text') or step.get('name', '')
+                if text:
+                    result['steps'].append(str(text).strip())
+    
+    return result
+
+
+def extract_json_ld_recipe(html: str, url: str) -> Optional[dict]:
+    """
+    Extract a recipe from JSON-LD blocks without building a parse tree.
+    
+    A regex pre-pass pulls out only the `application/ld+json` scripts, which is
+    an order of magnitude cheaper than parsing the whole page.
+    
+    Args:
+        html: Page HTML
+        url: Page URL, stored as the recipe source
+        
+    Returns:
+        Optional[dict]: Recipe fields, or None if no usable Recipe node was found
+    """
+    for match in JSON_LD_PATTERN.finditer(html):
+        payload = JSON_LD_WRAPPER_PATTERN.sub('', match.group(1)).strip()
+        try:
+            data = json.loads(payload, strict=False)
+        except ValueError:
+            continue
+        
+        recipe = find_recipe_node(data)
+        if recipe is None:
+            continue
+        
+        result = recipe_from_json_ld(recipe, url)
+        if result['name'] and (result['ingredients'] or result['steps']):
+            return result
+    
+    return None
+
+
+def parse_recipe_html(html: str, url: str) -> dict:
+    """
+    Extract recipe details from a page with multiple fallback strategies.
+    
+    Args:
+        html: Page HTML
+        url: Page URL, stored as the recipe source
+        
+    Returns:
+        dict: Recipe fields, or raw page text flagged with needs_ai_extraction
+    """
+    # Fast path: JSON-LD structured data, no parse tree needed
+    result = extract_json_ld_recipe(html, url)
+    if result:
+        return result
+    
+    result = _empty_result(url)
+    soup = BeautifulSoup(html, 'html.parser')
+    
+    # Fallback: site-specific selectors first, generic ones as a last resort
+    extractor = get_extractor(url)
+    for candidate in (extractor, GENERIC_EXTRACTOR):
+        if candidate is None:
+            continue
+        candidate.extract(soup, result)
+        if result['ingredients'] or result['steps']:
+            break
+    
+    # If still no data, include raw text for AI extraction
+    if not result['ingredients'] and not result['steps']:
+        # Get page text for AI fallback
+        for tag in soup(['script', 'style', 'nav', 'header', 'footer']):
+            tag.decompose()
+        result['raw_text'] = soup.get_text(separator='\n', strip=True)[:8000]
+        result['needs_ai_extraction'] = True
+    
+    return result
+
+
+class RecipeScraper:
+    """Scraper sharing one pooled HTTP/2 client across requests."""
+    
+    def __init__(
+        self,
+        cache: Optional[ScrapeCache] = None,
+        max_connections_per_host: int = MAX_CONNECTIONS_PER_HOST,
+    ):
+        """
+        Initialize the scraper.
+        
+        Args:
+            cache: Optional cache of parsed recipes keyed on the normalized URL
+            max_connections_per_host: Maximum concurrent requests to a single host
+        """
+        self.cache = cache
+        self.max_connections_per_host = max_connections_per_host
+        self._client: Optional[httpx.AsyncClient] = None
+        self._host_limits: dict[str, asyncio.Semaphore] = {}
+        self._validators: OrderedDict[str, dict] = OrderedDict()
+        self._revalidating: dict[str, asyncio.Task] = {}
+    
+    def _get_client(self) -> httpx.AsyncClient:
+        """Create the shared client on first use."""
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                http2=True,
+                follow_redirects=True,
+                timeout=REQUEST_TIMEOUT,
+                headers={"User-Agent": USER_AGENT},
+                limits=httpx.Limits(
+                    max_connections=MAX_CONNECTIONS,
+                    max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS,
+                ),
+            )
+        return self._client
+    
+    async def fetch(self, url: str, stop_at_recipe: bool = False) -> str:
+        """
+        Fetch a page, revalidating with ETag/Last-Modified when it was seen before.
+        
+        The body is streamed; with `stop_at_recipe`, the download stops as soon
+        as the HTML received so far holds a complete JSON-LD recipe, which is
+        usually in the page head.
+        
+        Args:
+            url: Page URL
+            stop_at_recipe: Return early once a JSON-LD recipe has been received
+            
+        Returns:
+            str: Page HTML (possibly truncated after the JSON-LD recipe)
+            
+        Raises:
+            httpx.HTTPError: If the request fails
+        """
+        host = urlsplit(url).netloc.lower()
+        limit = self._host_limits.setdefault(host, asyncio.Semaphore(self.max_connections_per_host))
+        
+        headers = {}
+        cached = self._validators.get(url)
+        if cached:
+            if cached.get("etag"):
+                headers["If-None-Match"] = cached["etag"]
+            if cached.get("last_modified"):
+                headers["If-Modified-Since"] = cached["last_modified"]
+        
+        async with limit:
+            async with self._get_client().stream("GET", url, headers=headers) as response:
+                if response.status_code == 304 and cached:
+                    self._validators.move_to_end(url)
+                    return cached["text"]
+                
+                response.raise_for_status()
+                
+                text = ""
+                # Offsets of the next "</script>" search and of the end of the last script parsed
+                scanned = parsed = 0
+                async for chunk in response.aiter_text():
+                    text += chunk
+                    if not stop_at_recipe:
+                        continue
+                    # Resume the search just before the previous end, so a tag split across chunks is found
+                    end = text.find(SCRIPT_END, max(scanned - len(SCRIPT_END) + 1, parsed))
+                    scanned = len(text)
+                    while end != -1:
+                        # Parse only the script closed here, not the whole page again
+                        start = text.rfind("<script", parsed, end)
+                        parsed = end + len(SCRIPT_END)
+                        if start != -1 and extract_json_ld_recipe(text[start:parsed], url):
+                            return text
+                        end = text.find(SCRIPT_END, parsed)
+        
+        # Validators are only kept for complete bodies
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        if etag or last_modified:
+            self._validators[url] = {"etag": etag, "last_modified": last_modified, "text": text}
+            self._validators.move_to_end(url)
+            while len(self._validators) > VALIDATOR_CACHE_SIZE:
+                self._validators.popitem(last=False)
+        
+        return text
+    
+    async def scrape(self, url: str) -> dict:
+        """
+        Fetch and parse a recipe page, serving it from the cache when possible.
+        
+        Stale cache entries are returned immediately while a background task
+        refreshes them.
+        
+        Args:
+            url: Recipe page URL
+            
+        Returns:
+            dict: Parsed recipe, or {"error", "url"} if the page could not be scraped
+        """
+        key = normalize_url(url)
+        
+        if self.cache is not None:
+            entry = await self.cache.aget_entry(key)
+            if entry is not None:
+                data, stale = entry
+                if stale and key not in self._revalidating:
+                    task = asyncio.create_task(self._scrape_and_store(url, key))
+                    self._revalidating[key] = task
+                    task.add_done_callback(lambda _: self._revalidating.pop(key, None))
+                return data
+        
+        return await self._scrape_and_store(url, key)
+    
+    async def _scrape_and_store(self, url: str, key: str) -> dict:
+        """Scrape `url` and cache successful results under `key`."""
+        try:
+            html = await self.fetch(url, stop_at_recipe=True)
+            data = parse_recipe_html(html, url)
+        except Exception as e:
+            return {"error": str(e), "url": url}
+        
+        if self.cache is not None:
+            await self.cache.aset(key, data)
+        
+        return data
+    
+    async def close(self) -> None:
+        """Close the shared client."""
+        for task in list(self._revalidating.values()):
+            task.cancel()
+        if self._client:
+            await self._client.aclose()
+        self._client = None
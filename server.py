@@ -4,28 +4,112 @@ Cookidoo MCP Server
 Main server file containing MCP tool definitions for interacting with Cookidoo.
 """
 
-from fastmcp import FastMCP
-from cookidoo_service import CookidooService, load_cookidoo_credentials
-from schemas import CustomRecipe
+from fastmcp import Context, FastMCP
+from pydantic import ValidationError
+from dotenv import load_dotenv
+from cache_store import PersistentCache, cache_path
+from cookidoo_service import load_cookidoo_credentials
+from localization import get_localization
+from session_manager import CookidooSessionManager, SessionRegistry
+from schemas import CustomRecipe, RecipeDetails, RecipeIngredient
+from scraper import RecipeScraper, default_scrape_cache
+import asyncio
 import json
+import os
+
+load_dotenv()
 
 # Initialize FastMCP server
 mcp = FastMCP("cookidoo-mcp-server")
 
-# Module-level state to store the authenticated session
-_cookidoo_service: CookidooService | None = None
-_cookidoo_api = None
+# Auto-refreshing Cookidoo sessions, one per account, bound to MCP client sessions
+_sessions = SessionRegistry(
+    idle_timeout=float(os.getenv("COOKIDOO_SESSION_IDLE_TIMEOUT", 1800)),
+    max_concurrent_logins=int(os.getenv("COOKIDOO_MAX_CONCURRENT_LOGINS", 4)),
+    connection_limit=int(os.getenv("COOKIDOO_TENANT_CONNECTIONS", 8)),
+)
+
+# Recipe details cache (memory LRU + SQLite), configurable from .env
+_recipe_cache = PersistentCache(
+    cache_path("recipe_details"),
+    ttl=float(os.getenv("COOKIDOO_RECIPE_CACHE_TTL", 24 * 3600)),
+    max_entries=int(os.getenv("COOKIDOO_RECIPE_CACHE_SIZE", 1000)),
+)
+
+# Last seen change stamp of each created recipe, per account and market, for incremental listings
+# (plus an index of the known recipe IDs, to spot recipes deleted outside this server, and the
+# progress of each listing walk, keyed by its snapshot so concurrent walks do not interfere)
+_created_recipe_stamps = PersistentCache(
+    cache_path("created_recipes"),
+    ttl=float(os.getenv("COOKIDOO_SYNC_STATE_TTL", 30 * 24 * 3600)),
+    max_entries=int(os.getenv("COOKIDOO_SYNC_STATE_SIZE", 20000)),
+)
+
+# Serializes the read-modify-write updates of the known recipe indexes
+_created_recipe_index_lock = asyncio.Lock()
+
+# Shared, connection-pooled recipe page scraper backed by the on-disk scrape cache
+_scraper = RecipeScraper(cache=default_scrape_cache())
+
+
+def _client_key(ctx: Context) -> str:
+    """Identify the MCP client session a tool call comes from."""
+    for attr in ("session_id", "client_id"):
+        try:
+            value = getattr(ctx, attr, None)
+        except Exception:
+            value = None
+        if value:
+            return str(value)
+    return "default"
+
+
+async def _get_session(ctx: Context) -> CookidooSessionManager:
+    """
+    Return the Cookidoo session bound to the calling client.
+    
+    Clients that never called connect_to_cookidoo are bound on demand to the
+    account configured in .env, after a login unless its session is already
+    open with the same credentials.
+    """
+    client_key = _client_key(ctx)
+    manager = await _sessions.get(client_key)
+    if manager is None:
+        try:
+            email, password = load_cookidoo_credentials()
+        except ValueError as e:
+            raise Exception(
+                "Not connected. Please run 'connect_to_cookidoo' with your Cookidoo email and password "
+                "(no default account is configured in .env)."
+            ) from e
+        manager = await _sessions.connect(client_key, email, password)
+    return manager
 
 
 @mcp.tool()
-async def connect_to_cookidoo() -> str:
+async def connect_to_cookidoo(
+    ctx: Context,
+    email: str | None = None,
+    password: str | None = None,
+    country: str | None = None,
+    language: str | None = None,
+) -> str:
     """
-    Authenticate with Cookidoo and store the session.
+    Authenticate with Cookidoo and store the session for this client.
     
-    This tool must be called before using other Cookidoo tools. It will:
-    1. Load your Cookidoo credentials from the .env file
+    Other Cookidoo tools connect automatically with the account from the .env
+    file; call this tool to use another account or to check the credentials. It will:
+    1. Use the given account, or load your Cookidoo credentials from the .env file
     2. Authenticate with the Cookidoo platform
     3. Store the authenticated session for use by other tools
+    
+    Clients connecting to the same account share one session.
+    
+    Args:
+        email: Cookidoo account email (default: COOKIDOO_EMAIL from .env)
+        password: Cookidoo account password (default: COOKIDOO_PASSWORD from .env)
+        country: Cookidoo country code, e.g. "fr", "de", "es" (default: COOKIDOO_COUNTRY or "fr")
+        language: Cookidoo language, e.g. "fr-FR", "de-DE" (default: the country's language)
         
     Returns:
         str: Success message confirming connection
@@ -34,19 +118,17 @@ async def connect_to_cookidoo() -> str:
         ValueError: If credentials are missing from .env file
         Exception: If authentication fails
     """
-    global _cookidoo_service, _cookidoo_api
-    
     try:
-        # Load credentials from .env file
-        email, password = load_cookidoo_credentials()
-        
-        # Create Cookidoo service instance
-        _cookidoo_service = CookidooService(email, password)
+        # Explicit account, or the one configured in the .env file
+        if not (email and password):
+            email, password = load_cookidoo_credentials()
         
-        # Authenticate and get API client
-        _cookidoo_api = await _cookidoo_service.login()
+        # Bind this client to the account's shared session and authenticate
+        manager = await _sessions.connect(_client_key(ctx), email, password, country, language)
+        service = await manager.get_service()
         
-        return f"Successfully connected to Cookidoo as {email}"
+        localization = service.api_client.localization
+        return f"Successfully connected to Cookidoo as {email} ({localization.country_code}/{localization.language})"
         
     except ValueError as e:
         # Missing credentials
@@ -57,16 +139,142 @@ async def connect_to_cookidoo() -> str:
         return f"Connection Failed: {str(e)}\n\nPlease check your credentials and try again."
 
 
+# Output formats of the recipe details tools
+RECIPE_OUTPUT_FORMATS = ("text", "json", "custom_recipe")
+
+
+def _recipe_to_details(recipe) -> RecipeDetails:
+    """Snapshot a cookidoo-api recipe object into a RecipeDetails model."""
+    return RecipeDetails(
+        id=recipe.id,
+        name=recipe.name,
+        serving_size=getattr(recipe, "serving_size", None),
+        active_time=getattr(recipe, "active_time", None),
+        total_time=getattr(recipe, "total_time", None),
+        difficulty=getattr(recipe, "difficulty", None),
+        ingredients=[
+            RecipeIngredient(
+                name=ingredient.name,
+                quantity=getattr(ingredient, "quantity", None) or getattr(ingredient, "description", None) or None,
+            )
+            for ingredient in getattr(recipe, "ingredients", None) or []
+        ],
+        steps=[step.description for step in getattr(recipe, "steps", None) or [] if hasattr(step, "description")],
+        notes=list(getattr(recipe, "notes", None) or []),
+        url=getattr(recipe, "url", None) or None,
+    )
+
+
+async def _fetch_recipe_details(ctx: Context, recipe_id: str) -> RecipeDetails:
+    """Return a recipe snapshot from the cache, fetching it from Cookidoo on a miss."""
+    # Take the market of the bound session, else the default one, without
+    # connecting: cached details are served even before connecting
+    manager = await _sessions.get(_client_key(ctx))
+    if manager is not None:
+        localization = await get_localization(manager.country, manager.language)
+    else:
+        localization = await get_localization()
+    
+    # Recipe details are localized: cache them per market language
+    cache_key = f"{localization.language}:{recipe_id}"
+    cached = await _recipe_cache.aget(cache_key)
+    if cached is not None:
+        return RecipeDetails.model_validate(cached)
+    
+    # Get recipe details (connects on demand and refreshes the token if needed)
+    if manager is None:
+        manager = await _get_session(ctx)
+    service = await manager.get_service()
+    recipe = _recipe_to_details(await service.get_recipe_details(recipe_id))
+    await _recipe_cache.aset(cache_key, recipe.model_dump(mode="json"))
+    
+    return recipe
+
+
+def _format_recipe_details(recipe: RecipeDetails) -> str:
+    """Format a recipe snapshot as human-readable text."""
+    lines = ["Recipe Details:", "", f"Name: {recipe.name}", f"ID: {recipe.id}", ""]
+    
+    if recipe.serving_size is not None:
+        lines.append(f"Servings: {recipe.serving_size}")
+    if recipe.total_time is not None:
+        lines.append(f"Total Time: {round(recipe.total_time / 60)} minutes")
+    if recipe.difficulty is not None:
+        lines.append(f"Difficulty: {recipe.difficulty}")
+    lines.append("")
+    
+    if recipe.ingredients:
+        lines.append("Ingredients:")
+        lines.extend(
+            f"  • {ingredient.name} - {ingredient.quantity}" if ingredient.quantity else f"  • {ingredient.name}"
+            for ingredient in recipe.ingredients
+        )
+        lines.append("")
+    
+    if recipe.steps:
+        lines.append("Steps:")
+        lines.extend(f"{i}. {step}" for i, step in enumerate(recipe.steps, 1))
+        lines.append("")
+    
+    if recipe.url:
+        lines.append(f"URL: {recipe.url}")
+        lines.append("")
+    
+    return "\n".join(lines)
+
+
+def _check_output_options(output_format: str, fields: list[str] | None) -> None:
+    """Validate the output_format and fields arguments of the recipe details tools."""
+    if output_format not in RECIPE_OUTPUT_FORMATS:
+        raise ValueError(f"Unknown output_format '{output_format}'. Use one of: {', '.join(RECIPE_OUTPUT_FORMATS)}")
+    unknown = set(fields or []) - set(RecipeDetails.model_fields)
+    if unknown:
+        raise ValueError(
+            f"Unknown fields: {', '.join(sorted(unknown))}. Available: {', '.join(RecipeDetails.model_fields)}"
+        )
+
+
+def _render_recipe(recipe: RecipeDetails, output_format: str, fields: list[str] | None) -> str:
+    """Render a recipe snapshot in the requested output format."""
+    if output_format == "json":
+        return recipe.model_dump_json(include=set(fields) if fields else None, exclude_none=True)
+    if output_format == "custom_recipe":
+        try:
+            return recipe.to_custom_recipe().model_dump_json(exclude_none=True)
+        except ValidationError as e:
+            # Some recipes lack fields CustomRecipe requires (e.g. steps): return a draft to complete
+            missing = sorted({str(error["loc"][0]) for error in e.errors()})
+            return json.dumps(
+                {"draft": recipe.custom_recipe_data(), "to_complete": missing},
+                ensure_ascii=False,
+            )
+    return _format_recipe_details(recipe)
+
+
 @mcp.tool()
-async def get_recipe_details(recipe_id: str) -> str:
+async def get_recipe_details(
+    recipe_id: str,
+    ctx: Context,
+    output_format: str = "text",
+    fields: list[str] | None = None,
+) -> str:
     """
     Get detailed information about a specific recipe by its ID.
     
     Use this tool to get full details about a recipe for inspiration before creating
-    your own custom recipe. You must be connected first using connect_to_cookidoo.
+    your own custom recipe. Connects automatically with the configured account if needed.
+    Results are cached, so asking for the same recipe again is instant.
+    
+    Use output_format="json" with `fields` (e.g. ["ingredients", "steps"]) to get
+    only what you need, or output_format="custom_recipe" to get a recipe that can
+    be edited and passed to 'upload_custom_recipe' directly.
     
     Args:
         recipe_id: The Cookidoo recipe ID (e.g., "r59322", "r907015")
+        output_format: "text" (default), "json" or "custom_recipe"
+        fields: Fields to include in "json" output (default: all). Available: id, name,
+            serving_size, active_time, total_time (seconds), difficulty, ingredients,
+            steps, notes, url
         
     Returns:
         str: Detailed recipe information including ingredients, steps, cooking time, etc.
@@ -74,61 +282,111 @@ async def get_recipe_details(recipe_id: str) -> str:
     Raises:
         Exception: If not connected or if the recipe is not found
     """
-    global _cookidoo_api
+    try:
+        _check_output_options(output_format, fields)
+        recipe = await _fetch_recipe_details(ctx, recipe_id)
+        return _render_recipe(recipe, output_format, fields)
+        
+    except Exception as e:
+        return f"Failed to get recipe details: {str(e)}"
+
+
+@mcp.tool()
+async def get_recipes_details(
+    recipe_ids: list[str],
+    ctx: Context,
+    max_concurrency: int = 5,
+    output_format: str = "text",
+    fields: list[str] | None = None,
+) -> str:
+    """
+    Get detailed information about several recipes at once.
     
+    Fetches all recipes concurrently, so comparing ten reference recipes costs
+    about one round trip. Duplicate IDs are fetched only once. Connects
+    automatically with the configured account if needed.
+    
+    Args:
+        recipe_ids: List of Cookidoo recipe IDs (e.g., ["r59322", "r907015"])
+        max_concurrency: Maximum number of requests in flight (default: 5, range: 1-10)
+        output_format: "text" (default), "json" or "custom_recipe" (see get_recipe_details);
+            structured formats return a JSON array
+        fields: Fields to include in "json" output (default: all)
+        
+    Returns:
+        str: Details of each recipe in the requested order, with per-recipe errors
+    """
     try:
-        # Check if connected
-        if not _cookidoo_api:
-            return "Not connected. Please run 'connect_to_cookidoo' first."
-        
-        # Get recipe details
-        recipe = await _cookidoo_api.get_recipe_details(recipe_id)
-        
-        # Format the results
-        result = f"Recipe Details:\n\n"
-        result += f"Name: {recipe.name}\n"
-        result += f"ID: {recipe.id}\n\n"
-        
-        if hasattr(recipe, 'serving_size'):
-            result += f"Servings: {recipe.serving_size}\n"
-        
-        if hasattr(recipe, 'total_time'):
-            result += f"Total Time: {recipe.total_time} minutes\n"
-        
-        if hasattr(recipe, 'difficulty'):
-            result += f"Difficulty: {recipe.difficulty}\n"
-        
-        result += "\n"
-        
-        # Ingredients
-        if hasattr(recipe, 'ingredients') and recipe.ingredients:
-            result += "Ingredients:\n"
-            for ingredient in recipe.ingredients:
-                if hasattr(ingredient, 'name'):
-                    result += f"  • {ingredient.name}"
-                    if hasattr(ingredient, 'quantity') and ingredient.quantity:
-                        result += f" - {ingredient.quantity}"
-                    result += "\n"
-            result += "\n"
-        
-        # Steps
-        if hasattr(recipe, 'steps') and recipe.steps:
-            result += "Steps:\n"
-            for i, step in enumerate(recipe.steps, 1):
-                if hasattr(step, 'description'):
-                    result += f"{i}. {step.description}\n"
-            result += "\n"
-        
-        # URL if available
-        if hasattr(recipe, 'url') and recipe.url:
-            result += f"URL: {recipe.url}\n"
-        
-        return result
+        _check_output_options(output_format, fields)
+        
+        # Remove duplicates while keeping the requested order
+        unique_ids = list(dict.fromkeys(rid.strip() for rid in recipe_ids if rid.strip()))
+        if not unique_ids:
+            return "No recipe IDs provided."
+        
+        semaphore = asyncio.Semaphore(min(max(max_concurrency, 1), 10))
+        
+        async def fetch(recipe_id: str) -> str:
+            try:
+                async with semaphore:
+                    recipe = await _fetch_recipe_details(ctx, recipe_id)
+                return _render_recipe(recipe, output_format, fields)
+            except Exception as e:
+                if output_format != "text":
+                    return json.dumps({"id": recipe_id, "error": str(e)}, ensure_ascii=False)
+                return f"Failed to get recipe details for {recipe_id}: {str(e)}\n"
+        
+        results = await asyncio.gather(*(fetch(rid) for rid in unique_ids))
+        
+        if output_format != "text":
+            return "[" + ",".join(results) + "]"
+        return "\n---\n\n".join(results)
         
     except Exception as e:
         return f"Failed to get recipe details: {str(e)}"
 
 
+@mcp.tool()
+async def get_recipe_cache_stats() -> str:
+    """
+    Show hit/miss statistics of the recipe details cache.
+    
+    Returns:
+        str: Cache counters, hit rate and current sizes
+    """
+    stats = await asyncio.to_thread(lambda: _recipe_cache.stats)
+    return (
+        f"Recipe cache: {stats['hits']} hits ({stats['memory_hits']} memory, "
+        f"{stats['disk_hits']} disk), {stats['misses']} misses, "
+        f"hit rate {stats['hit_rate']:.0%}\n"
+        f"Entries: {stats['memory_size']} in memory, {stats['disk_size']} on disk "
+        f"(TTL {_recipe_cache.ttl:.0f}s, max {_recipe_cache.max_entries})"
+    )
+
+
+@mcp.tool()
+async def scrape_recipe_url(url: str) -> str:
+    """
+    Extract a recipe from a web page (Marmiton, CuisineAZ, 750g, etc.).
+    
+    Use this to import a recipe found online before adapting it and creating
+    your own custom recipe. No Cookidoo connection is required.
+    
+    Args:
+        url: URL of the recipe page
+        
+    Returns:
+        str: Extracted recipe data in JSON format, or raw page text when the
+            page has no recognizable recipe structure
+    """
+    data = await _scraper.scrape(url)
+    
+    if data.get("error"):
+        return f"Failed to scrape recipe: {data['error']}"
+    
+    return json.dumps(data, ensure_ascii=False, indent=2)
+
+
 @mcp.tool()
 async def generate_recipe_structure(
     name: str,
@@ -203,7 +461,7 @@ async def generate_recipe_structure(
 
 
 @mcp.tool()
-async def upload_custom_recipe(recipe_json: str) -> str:
+async def upload_custom_recipe(recipe_json: str, ctx: Context) -> str:
     """
     Upload a custom recipe to your Cookidoo account.
     
@@ -217,12 +475,9 @@ async def upload_custom_recipe(recipe_json: str) -> str:
     Returns:
         str: Success message with the created recipe ID
     """
-    global _cookidoo_service, _cookidoo_api
-    
     try:
-        # Check if connected
-        if not _cookidoo_service or not _cookidoo_api:
-            return "Not connected. Please run 'connect_to_cookidoo' first."
+        # Connect on demand with the configured account if needed
+        manager = await _get_session(ctx)
         
         # Parse and validate the recipe JSON
         try:
@@ -233,8 +488,9 @@ async def upload_custom_recipe(recipe_json: str) -> str:
         except Exception as e:
             return f"Invalid recipe data: {str(e)}"
         
-        # Create the recipe using our custom service method
-        recipe_id = await _cookidoo_service.create_custom_recipe(
+        # Create the recipe using the shared, authenticated service
+        service = await manager.get_service()
+        recipe_id = await service.create_custom_recipe(
             name=recipe.name,
             ingredients=recipe.ingredients,
             steps=recipe.steps,
@@ -245,10 +501,257 @@ async def upload_custom_recipe(recipe_json: str) -> str:
         )
         
         # Get localization for URL
-        localization = _cookidoo_api.localization
+        localization = service.api_client.localization
         recipe_url = f"https://{localization.url}/recipes/custom-recipes/{recipe_id}"
         
         return f"Recipe '{recipe.name}' created successfully!\n\nRecipe ID: {recipe_id}\nURL: {recipe_url}\n\nYour recipe is now saved in your Cookidoo account!"
         
     except Exception as e:
         return f"Upload failed: {str(e)}"
+
+
+@mcp.tool()
+async def upload_custom_recipes(recipes_json: str, ctx: Context, max_concurrency: int = 4) -> str:
+    """
+    Upload several custom recipes to your Cookidoo account in one call.
+    
+    Recipes are uploaded concurrently over a single authenticated session and
+    failed uploads are retried automatically. Use this for weekly menus or
+    imported cookbooks instead of calling 'upload_custom_recipe' repeatedly.
+    
+    Args:
+        recipes_json: JSON array of recipes, each in the format produced by generate_recipe_structure
+        max_concurrency: Maximum number of uploads running at once (default: 4, range: 1-10)
+        
+    Returns:
+        str: Per-recipe upload report with created recipe IDs and errors
+    """
+    try:
+        # Connect on demand with the configured account if needed
+        manager = await _get_session(ctx)
+        
+        # Parse and validate every recipe before uploading any of them
+        try:
+            recipes_data = json.loads(recipes_json)
+        except json.JSONDecodeError as e:
+            return f"Invalid JSON: {str(e)}"
+        
+        if not isinstance(recipes_data, list) or not recipes_data:
+            return "Invalid recipe data: expected a non-empty JSON array of recipes"
+        
+        recipes = []
+        for index, recipe_data in enumerate(recipes_data, 1):
+            try:
+                recipes.append(CustomRecipe(**recipe_data))
+            except Exception as e:
+                return f"Invalid recipe data for recipe #{index}: {str(e)}"
+        
+        service = await manager.get_service()
+        results = await service.create_custom_recipes(
+            recipes, max_concurrency=min(max(max_concurrency, 1), 10)
+        )
+        
+        localization = service.api_client.localization
+        succeeded = sum(1 for r in results if r["success"])
+        
+        lines = [f"Uploaded {succeeded}/{len(results)} recipes.", ""]
+        for result in results:
+            if result["success"]:
+                recipe_url = f"https://{localization.url}/recipes/custom-recipes/{result['recipe_id']}"
+                lines.append(f"✓ {result['name']} - ID: {result['recipe_id']} - {recipe_url}")
+            else:
+                lines.append(
+                    f"✗ {result['name']} - failed after {result['attempts']} attempts: {result['error']}"
+                )
+        
+        return "\n".join(lines)
+        
+    except Exception as e:
+        return f"Bulk upload failed: {str(e)}"
+
+
+async def _stamp_prefix(manager: CookidooSessionManager) -> str:
+    """Key prefix of the change stamps of an account's created recipes."""
+    localization = await get_localization(manager.country, manager.language)
+    return f"{manager.email}:{localization.language}:"
+
+
+@mcp.tool()
+async def list_created_recipes(
+    ctx: Context,
+    cursor: str | None = None,
+    page_size: int = 50,
+    changed_only: bool = False,
+) -> str:
+    """
+    List the recipes created on your Cookidoo account ("Mes Créations"), page by page.
+    
+    Each recipe is flagged as new, changed or unchanged since the last listing,
+    and the last page of a full walk reports the recipes deleted since then,
+    so a large library can be synced
+    by fetching the details of the changed recipes only. Cookidoo has no
+    change feed: the server still reads every page in full, the comparison
+    with the previous listing happens on this side. Pass the returned cursor
+    to get the next page; if the library changes mid-walk, start again
+    without a cursor.
+    
+    Args:
+        cursor: Cursor of the page to list, as returned by the previous call (omit for the first page)
+        page_size: Number of recipes per page (default: 50, max: 200; fixed by the cursor afterwards)
+        changed_only: Only report new and changed recipes (default: False)
+    
+    Returns:
+        str: The recipes of the page with their IDs and change status, and the next cursor
+    """
+    try:
+        manager = await _get_session(ctx)
+        service = await manager.get_service()
+        page = await service.list_created_recipes(cursor=cursor, page_size=page_size)
+        prefix = await _stamp_prefix(manager)
+        index_key = prefix + "#index"
+        walk_key = prefix + "#walk:" + page["snapshot"]
+        if cursor:
+            # None when the walk state expired: deletions can then not be told apart
+            walk = await _created_recipe_stamps.aget(walk_key)
+        else:
+            # Only recipes known when the walk starts can be reported deleted by it
+            walk = {"known": await _created_recipe_stamps.aget(index_key) or [], "seen": []}
+        
+        lines = []
+        changed = 0
+        for recipe in page["recipes"]:
+            key = prefix + recipe["recipe_id"]
+            entry = await _created_recipe_stamps.aget(key)
+            if entry is not None and entry["stamp"] == recipe["change_stamp"]:
+                status = "unchanged"
+            else:
+                status = "new" if entry is None else "changed"
+                changed += 1
+            # Stamps of unchanged recipes are written too: refreshes their TTL
+            await _created_recipe_stamps.aset(key, {"stamp": recipe["change_stamp"], "name": recipe["name"]})
+            if status != "unchanged" or not changed_only:
+                lines.append(f"• [{status}] {recipe['name']} - ID: {recipe['recipe_id']}")
+        
+        listed = {recipe["recipe_id"] for recipe in page["recipes"]}
+        deleted = set()
+        if walk is not None:
+            seen = set(walk["seen"]) | listed
+            if page["complete"]:
+                # End of a full walk: recipes known at its start that it did not see were deleted elsewhere
+                for recipe_id in sorted(set(walk["known"]) - seen):
+                    entry = await _created_recipe_stamps.aget(prefix + recipe_id)
+                    if entry is not None:
+                        lines.append(f"• [deleted] {entry['name']} - ID: {recipe_id}")
+                        changed += 1
+                        await _created_recipe_stamps.adelete(prefix + recipe_id)
+                    deleted.add(recipe_id)
+                if cursor:
+                    await _created_recipe_stamps.adelete(walk_key)
+            else:
+                await _created_recipe_stamps.aset(walk_key, {"known": walk["known"], "seen": sorted(seen)})
+        
+        async with _created_recipe_index_lock:
+            known = set(await _created_recipe_stamps.aget(index_key) or [])
+            if deleted or not listed <= known:
+                await _created_recipe_stamps.aset(index_key, sorted((known - deleted) | listed))
+        
+        header = f"{len(page['recipes'])} created recipes on this page, {changed} new, changed or deleted."
+        footer = (
+            f"More recipes: call again with cursor='{page['next_cursor']}'."
+            if page["next_cursor"] else "End of the list."
+        )
+        return "\n".join([header, ""] + lines + ([""] if lines else []) + [footer])
+    
+    except Exception as e:
+        return f"Listing failed: {str(e)}"
+
+
+@mcp.tool()
+async def update_custom_recipe(recipe_id: str, recipe_json: str, ctx: Context) -> str:
+    """
+    Update an existing custom recipe in place instead of creating a duplicate.
+    
+    The recipe content is replaced entirely: pass the full recipe, in the
+    format produced by generate_recipe_structure.
+    
+    Args:
+        recipe_id: ID of the created recipe to update (see list_created_recipes)
+        recipe_json: The validated recipe JSON from generate_recipe_structure
+    
+    Returns:
+        str: Success message with the recipe URL
+    """
+    try:
+        manager = await _get_session(ctx)
+        
+        try:
+            recipe = CustomRecipe(**json.loads(recipe_json))
+        except json.JSONDecodeError as e:
+            return f"Invalid JSON: {str(e)}"
+        except Exception as e:
+            return f"Invalid recipe data: {str(e)}"
+        
+        service = await manager.get_service()
+        await service.update_custom_recipe(
+            recipe_id,
+            name=recipe.name,
+            ingredients=recipe.ingredients,
+            steps=recipe.steps,
+            servings=recipe.servings,
+            prep_time=recipe.prep_time,
+            total_time=recipe.total_time,
+            hints=recipe.hints
+        )
+        
+        localization = service.api_client.localization
+        recipe_url = f"https://{localization.url}/recipes/custom-recipes/{recipe_id}"
+        
+        return f"Recipe '{recipe.name}' updated successfully!\n\nRecipe ID: {recipe_id}\nURL: {recipe_url}"
+    
+    except Exception as e:
+        return f"Update failed: {str(e)}"
+
+
+@mcp.tool()
+async def delete_custom_recipes(recipe_ids: list[str], ctx: Context, max_concurrency: int = 4) -> str:
+    """
+    Delete one or several custom recipes from your Cookidoo account.
+    
+    Deletion is permanent. Use list_created_recipes to find the IDs of
+    duplicates to clean up.
+    
+    Args:
+        recipe_ids: IDs of the created recipes to delete
+        max_concurrency: Maximum number of deletions running at once (default: 4, range: 1-10)
+    
+    Returns:
+        str: Per-recipe deletion report
+    """
+    try:
+        if not recipe_ids:
+            return "No recipe IDs given."
+        
+        manager = await _get_session(ctx)
+        service = await manager.get_service()
+        results = await service.delete_custom_recipes(
+            recipe_ids, max_concurrency=min(max(max_concurrency, 1), 10)
+        )
+        prefix = await _stamp_prefix(manager)
+        
+        deleted = 0
+        lines = []
+        for result in results:
+            if result["error"]:
+                lines.append(f"✗ {result['recipe_id']} - {result['error']}")
+                continue
+            await _created_recipe_stamps.adelete(prefix + result["recipe_id"])
+            if result["deleted"]:
+                deleted += 1
+                lines.append(f"✓ {result['recipe_id']} deleted")
+            else:
+                lines.append(f"- {result['recipe_id']} not found (already deleted?)")
+        
+        return "\n".join([f"Deleted {deleted}/{len(results)} recipes.", ""] + lines)
+    
+    except Exception as e:
+        return f"Bulk deletion failed: {str(e)}"
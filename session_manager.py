@@ -0,0 +1,352 @@
+"""
+Cookidoo Session Manager
+
+Long-lived, shared wrapper around CookidooService that reuses one authenticated
+session and connection pool and refreshes the access token before it expires,
+plus a registry holding one such session per Cookidoo account and market for
+multi-tenant use.
+"""
+
+import asyncio
+import contextlib
+import hmac
+import time
+from typing import Optional
+from cookidoo_service import CONNECTION_POOL_LIMIT, CookidooService
+from localization import get_localization
+
+
+# Refresh the access token when it expires within this many seconds
+REFRESH_MARGIN = 300
+
+# Multi-tenant registry settings
+SESSION_IDLE_TIMEOUT = 1800
+EVICTION_INTERVAL = 60
+MAX_CONCURRENT_LOGINS = 4
+TENANT_CONNECTION_LIMIT = 8
+
+
+class CookidooSessionManager:
+    """Shared, lazily authenticated Cookidoo session."""
+    
+    def __init__(
+        self,
+        email: str,
+        password: str,
+        refresh_margin: float = REFRESH_MARGIN,
+        connection_limit: int = CONNECTION_POOL_LIMIT,
+        login_limiter: Optional[asyncio.Semaphore] = None,
+        country: Optional[str] = None,
+        language: Optional[str] = None,
+    ):
+        """
+        Initialize the session manager.
+        
+        Args:
+            email: Cookidoo account email
+            password: Cookidoo account password
+            refresh_margin: Seconds before expiry at which the token is refreshed
+            connection_limit: Size of the session's connection pool
+            login_limiter: Optional semaphore bounding concurrent logins and
+                refreshes across sessions
+            country: Cookidoo country code (default: COOKIDOO_COUNTRY)
+            language: Cookidoo language (default: the country's default)
+        """
+        self.email = email
+        self.password = password
+        self.refresh_margin = refresh_margin
+        self.connection_limit = connection_limit
+        self.country = country
+        self.language = language
+        self.last_used = time.monotonic()
+        self._login_limiter = login_limiter
+        self._service: Optional[CookidooService] = None
+        self._lock = asyncio.Lock()
+    
+    async def get_service(self) -> CookidooService:
+        """
+        Return an authenticated service, logging in or refreshing only when needed.
+        
+        Returns:
+            CookidooService: Authenticated service sharing one ClientSession
+            
+        Raises:
+            Exception: If authentication fails
+        """
+        self.last_used = time.monotonic()
+        
+        async with self._lock:
+            if self._service is None or self._service.api_client is None:
+                service = CookidooService(
+                    self.email,
+                    self.password,
+                    connection_limit=self.connection_limit,
+                    country=self.country,
+                    language=self.language,
+                )
+                async with self._login_slot():
+                    await service.login()
+                self._service = service
+            elif self._service.token_expires_within(self.refresh_margin):
+                async with self._login_slot():
+                    try:
+                        await self._service.refresh_token()
+                    except Exception:
+                        # Refresh token rejected: fall back to a full login
+                        await self._service.close()
+                        await self._service.login()
+            
+            return self._service
+    
+    def _login_slot(self):
+        """Context manager holding one of the shared login slots, if limited."""
+        return self._login_limiter if self._login_limiter is not None else contextlib.nullcontext()
+    
+    @property
+    def is_connected(self) -> bool:
+        """Whether an authenticated session is currently held."""
+        return self._service is not None and self._service.api_client is not None
+    
+    async def close(self) -> None:
+        """Close the shared session."""
+        async with self._lock:
+            if self._service:
+                await self._service.close()
+            self._service = None
+
+
+class SessionRegistry:
+    """One session per Cookidoo account and market, shared by the MCP clients bound to it."""
+    
+    def __init__(
+        self,
+        idle_timeout: float = SESSION_IDLE_TIMEOUT,
+        max_concurrent_logins: int = MAX_CONCURRENT_LOGINS,
+        connection_limit: int = TENANT_CONNECTION_LIMIT,
+    ):
+        """
+        Initialize the registry.
+        
+        Idle sessions are swept by a background task started with the first
+        connect(), every EVICTION_INTERVAL seconds, so they are closed even
+        when no tool is called anymore.
+        
+        Args:
+            idle_timeout: Seconds without use after which a session is closed
+                and its client bindings are dropped
+            max_concurrent_logins: Maximum number of logins/refreshes in flight
+            connection_limit: Connection pool size of each tenant's session
+        """
+        self.idle_timeout = idle_timeout
+        self.connection_limit = connection_limit
+        self._login_limiter = asyncio.Semaphore(max(1, max_concurrent_logins))
+        # Sessions keyed by (account, country code, language); each client is bound
+        # to the manager instance it logged in with, and the time of its last call
+        self._accounts: dict[tuple[str, str, str], CookidooSessionManager] = {}
+        self._clients: dict[str, tuple[tuple[str, str, str], CookidooSessionManager, float]] = {}
+        self._lock = asyncio.Lock()
+        self._last_sweep = time.monotonic()
+        self._sweeper: Optional[asyncio.Task] = None
+    
+    async def connect(
+        self,
+        client_key: str,
+        email: str,
+        password: str,
+        country: Optional[str] = None,
+        language: Optional[str] = None,
+    ) -> CookidooSessionManager:
+        """
+        Bind a client to an account and market, creating their session if needed.
+        
+        The market is resolved first (defaults included), so clients of the
+        same account on different markets get separate sessions instead of
+        replacing each other's. Clients on the same account and market share
+        one session, but only with the password that session logged in with.
+        Any other password is verified by a login before anything is stored
+        or bound: on failure the client stays unbound and the existing
+        session is left alone; on success the session is replaced and the
+        clients bound to the old one must connect again.
+        
+        Args:
+            client_key: Identifier of the MCP client session
+            email: Cookidoo account email
+            password: Cookidoo account password
+            country: Cookidoo country code (default: COOKIDOO_COUNTRY)
+            language: Cookidoo language (default: the country's default)
+            
+        Returns:
+            CookidooSessionManager: The account's authenticated session manager
+            
+        Raises:
+            ValueError: If the market does not exist
+            Exception: If the login with the given credentials fails
+        """
+        self._ensure_sweeper()
+        await self._maybe_evict()
+        localization = await get_localization(country, language)
+        country, language = localization.country_code.lower(), localization.language
+        account = (email.strip().lower(), country, language)
+        
+        async with self._lock:
+            manager = self._accounts.get(account)
+        
+        if manager is None or not self._same_password(manager, password):
+            # Log in before storing or binding anything: raises on bad credentials
+            candidate = self._new_manager(email, password, country, language)
+            await candidate.get_service()
+            async with self._lock:
+                current = self._accounts.get(account)
+                if current is not None and current is not manager and self._same_password(current, password):
+                    # A concurrent connect with the same credentials won the race
+                    replaced, manager = candidate, current
+                else:
+                    replaced, manager = current, candidate
+                    self._accounts[account] = candidate
+            if replaced is not None:
+                await replaced.close()
+        
+        async with self._lock:
+            previous = self._clients.get(client_key)
+            self._clients[client_key] = (account, manager, time.monotonic())
+        
+        if previous and previous[0] != account:
+            await self._release_unbound(previous[0])
+        
+        return manager
+    
+    @staticmethod
+    def _same_password(manager: CookidooSessionManager, password: str) -> bool:
+        """Compare a password with the one a session logged in with, in constant time."""
+        return hmac.compare_digest(manager.password.encode("utf-8"), password.encode("utf-8"))
+    
+    def _new_manager(
+        self,
+        email: str,
+        password: str,
+        country: Optional[str],
+        language: Optional[str],
+    ) -> CookidooSessionManager:
+        """Create a session manager sharing the registry's limits."""
+        return CookidooSessionManager(
+            email,
+            password,
+            connection_limit=self.connection_limit,
+            login_limiter=self._login_limiter,
+            country=country,
+            language=language,
+        )
+    
+    async def get(self, client_key: str) -> Optional[CookidooSessionManager]:
+        """
+        Return the session manager bound to a client.
+        
+        Args:
+            client_key: Identifier of the MCP client session
+            
+        Returns:
+            Optional[CookidooSessionManager]: The manager, or None if the client
+                never connected, its binding expired or its session was replaced
+        """
+        await self._maybe_evict()
+        
+        binding = self._clients.get(client_key)
+        if binding is None:
+            return None
+        
+        account, manager, _ = binding
+        if self._accounts.get(account) is not manager:
+            # Replaced after a password change: the client has to connect again
+            del self._clients[client_key]
+            return None
+        
+        self._clients[client_key] = (account, manager, time.monotonic())
+        return manager
+    
+    async def disconnect(self, client_key: str) -> None:
+        """Unbind a client, closing its account's session when no client uses it anymore."""
+        binding = self._clients.pop(client_key, None)
+        if binding:
+            await self._release_unbound(binding[0])
+    
+    async def evict_idle(self) -> int:
+        """
+        Close idle sessions and drop idle client bindings.
+        
+        Returns:
+            int: Number of sessions closed
+        """
+        now = time.monotonic()
+        self._last_sweep = now
+        
+        async with self._lock:
+            for client_key, (_, _, last_used) in list(self._clients.items()):
+                if now - last_used > self.idle_timeout:
+                    del self._clients[client_key]
+            
+            bound = {account for account, _, _ in self._clients.values()}
+            idle = [
+                account for account, manager in self._accounts.items()
+                if account not in bound or now - manager.last_used > self.idle_timeout
+            ]
+            
+            closed = 0
+            for account in idle:
+                manager = self._accounts[account]
+                if account not in bound:
+                    del self._accounts[account]
+                if manager.is_connected:
+                    # Bound accounts keep their manager and log in again lazily
+                    await manager.close()
+                    closed += 1
+        
+        return closed
+    
+    async def close_all(self) -> None:
+        """Close every session, forget every client and stop the idle sweep."""
+        if self._sweeper is not None:
+            self._sweeper.cancel()
+            self._sweeper = None
+        async with self._lock:
+            for manager in self._accounts.values():
+                await manager.close()
+            self._accounts.clear()
+            self._clients.clear()
+    
+    @property
+    def stats(self) -> dict:
+        """Number of clients, accounts and open sessions."""
+        return {
+            "clients": len(self._clients),
+            "accounts": len(self._accounts),
+            "connected": sum(1 for manager in self._accounts.values() if manager.is_connected),
+        }
+    
+    async def _maybe_evict(self) -> None:
+        """Run an idle sweep at most every EVICTION_INTERVAL seconds."""
+        if time.monotonic() - self._last_sweep >= EVICTION_INTERVAL:
+            await self.evict_idle()
+    
+    def _ensure_sweeper(self) -> None:
+        """Start the periodic idle sweep on the running event loop, once."""
+        if self._sweeper is None or self._sweeper.done():
+            self._sweeper = asyncio.get_running_loop().create_task(self._sweep_forever())
+    
+    async def _sweep_forever(self) -> None:
+        """Sweep idle sessions every EVICTION_INTERVAL seconds."""
+        while True:
+            await asyncio.sleep(EVICTION_INTERVAL)
+            try:
+                await self._maybe_evict()
+            except Exception:
+                # A failed close must not stop the sweep
+                pass
+    
+    async def _release_unbound(self, account: tuple[str, str, str]) -> None:
+        """Close and forget an account's session once no client is bound to it."""
+        async with self._lock:
+            if any(bound == account for bound, _, _ in self._clients.values()):
+                return
+            manager = self._accounts.pop(account, None)
+        if manager:
+            await manager.close()
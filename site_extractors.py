@@ -0,0 +1,135 @@
+"""
+Site Extractors
+
+Registry of per-site recipe extractors with precompiled CSS selectors, used by
+the scraper's HTML fallback when a page has no JSON-LD recipe.
+"""
+
+from typing import Optional
+from urllib.parse import urlsplit
+import soupsieve as sv
+from bs4 import BeautifulSoup
+
+
+class SiteExtractor:
+    """Precompiled selectors extracting a recipe from one site's HTML."""
+    
+    def __init__(
+        self,
+        title: list[str],
+        ingredients: list[str],
+        steps: list[str],
+        separator: str = " ",
+    ):
+        """
+        Compile the selectors of a site.
+        
+        Each field is filled from the first selector that matches.
+        
+        Args:
+            title: Selectors for the recipe title
+            ingredients: Selectors for ingredient lines
+            steps: Selectors for instruction steps
+            separator: Separator used when joining the text of nested tags
+        """
+        self.title = [sv.compile(selector) for selector in title]
+        self.ingredients = [sv.compile(selector) for selector in ingredients]
+        self.steps = [sv.compile(selector) for selector in steps]
+        self.separator = separator
+    
+    def extract(self, soup: BeautifulSoup, result: dict) -> dict:
+        """
+        Fill the title, ingredients and steps of `result` from the page.
+        
+        Args:
+            soup: Parsed page
+            result: Recipe fields to update
+        
+        Returns:
+            dict: The updated result
+        """
+        for selector in self.title:
+            tag = selector.select_one(soup)
+            if tag:
+                result['name'] = tag.get_text(self.separator, strip=True)
+                break
+        
+        for field, selectors in (('ingredients', self.ingredients), ('steps', self.steps)):
+            for selector in selectors:
+                texts = [el.get_text(self.separator, strip=True) for el in selector.select(soup)]
+                texts = [text for text in texts if text]
+                if texts:
+                    result[field] = texts
+                    break
+        
+        return result
+
+
+# Generic selectors, tried as a last resort on unknown sites
+GENERIC_EXTRACTOR = SiteExtractor(
+    title=['h1', 'title'],
+    ingredients=['[class*="ingredient"]', '[itemprop="recipeIngredient"]', '.ingredients li', 'ul.ingredients li'],
+    steps=['[class*="instruction"]', '[class*="step"]', '[itemprop="recipeInstructions"]', '.preparation li', '.steps li'],
+    separator="",
+)
+
+_EXTRACTORS: dict[str, SiteExtractor] = {}
+
+
+def register_extractor(domains: list[str], extractor: SiteExtractor) -> None:
+    """
+    Register an extractor for one or more domains (subdomains included).
+    
+    Args:
+        domains: Registrable domains, e.g. ["marmiton.org"]
+        extractor: Extractor to use for those domains
+    """
+    for domain in domains:
+        _EXTRACTORS[domain.lower()] = extractor
+
+
+def get_extractor(url: str) -> Optional[SiteExtractor]:
+    """
+    Find the extractor registered for the host of `url`.
+    
+    Args:
+        url: Page URL
+    
+    Returns:
+        Optional[SiteExtractor]: The site extractor, or None for unknown sites
+    """
+    host = (urlsplit(url).hostname or "").lower()
+    
+    # Try "www.marmiton.org", then "marmiton.org", then "org"
+    while host:
+        extractor = _EXTRACTORS.get(host)
+        if extractor:
+            return extractor
+        host = host.partition(".")[2]
+    
+    return None
+
+
+register_extractor(["marmiton.org"], SiteExtractor(
+    title=['h1'],
+    ingredients=['.card-ingredient', '.mrtn-recette_ingredients-items li'],
+    steps=['.recipe-step-list__container p', '.recipe-preparation__list__item'],
+))
+
+register_extractor(["cuisineaz.com"], SiteExtractor(
+    title=['h1'],
+    ingredients=['.ingredient_list li', 'section.ingredients li'],
+    steps=['.preparation_step p', '#preparation li', '#preparation p'],
+))
+
+register_extractor(["750g.com"], SiteExtractor(
+    title=['h1'],
+    ingredients=['.recipe-ingredients-item-label', '.recipe-ingredients li'],
+    steps=['.recipe-steps-text', '.recipe-steps li'],
+))
+
+register_extractor(["cuisine.journaldesfemmes.fr"], SiteExtractor(
+    title=['h1'],
+    ingredients=['.app_recipe_ing_title', '.recipe_ingredients li'],
+    steps=['.app_recipe_list--steps li', '.recipe_steps li'],
+))
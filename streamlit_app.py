@@ -8,11 +8,15 @@ import streamlit as st
 import asyncio
 import json
 import re
-import httpx
-from bs4 import BeautifulSoup
-import google.generativeai as genai
-from cookidoo_service import CookidooService
-from schemas import CustomRecipe
+from cache_store import PersistentCache, cache_path
+from session_manager import CookidooSessionManager
+from schemas import CustomRecipe, RecipeAdaptation
+from scraper import RecipeScraper, ScrapeCache, default_scrape_cache, normalize_url
+from chat_history import HISTORY_WINDOW, HistoryManager
+from gemini_service import GeminiService, StreamingResponseParser, clean_response_for_display, extract_recipe_json, parse_adaptation
+from image_pipeline import IMAGE_FORMAT, IMAGE_MAX_SIDE, preprocess_image
+from batch_import import BATCH_MAX_WORKERS, BATCH_REQUESTS_PER_MINUTE, BatchImporter
+from background_worker import WORKER_THREADS, BackgroundWorker
 import extra_streamlit_components as stx
 import datetime
 import hashlib
@@ -520,134 +524,91 @@ st.markdown("""
 
 # ==================== TOOL FUNCTIONS ====================
 
-@st.cache_data(ttl=3600)
-def scrape_recipe_from_url(url: str) -> dict:
-    """Scrape recipe details with multiple fallback strategies."""
-    try:
-        headers = {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
-        }
-        
-        with httpx.Client(follow_redirects=True, timeout=15.0) as client:
-            response = client.get(url, headers=headers)
-            response.raise_for_status()
-        
-        soup = BeautifulSoup(response.text, 'html.parser')
-        
-        result = {
-            "name": "",
-            "servings": 4,
-            "total_time": 60,
-            "ingredients": [],
-            "steps": [],
-            "source_url": url
-        }
-        
-        # Try JSON-LD structured data first
-        json_ld_scripts = soup.find_all('script', type='application/ld+json')
-        for script in json_ld_scripts:
-            try:
-                data = json.loads(script.string)
-                
-                if isinstance(data, list):
-                    for item in data:
-                        if isinstance(item, dict) and item.get('@type') == 'Recipe':
-                            data = item
-                            break
-                    else:
-                        continue
-                
-                if '@graph' in data:
-                    for item in data['@graph']:
-                        if isinstance(item, dict) and item.get('@type') == 'Recipe':
-                            data = item
-                            break
-                    else:
-                        continue
-                
-                if data.get('@type') == 'Recipe':
-                    result['name'] = data.get('name', '')
-                    
-                    yield_val = data.get('recipeYield')
-                    if yield_val:
-                        if isinstance(yield_val, list):
-                            yield_val = yield_val[0]
-                        match = re.search(r'(\d+)', str(yield_val))
-                        if match:
-                            result['servings'] = int(match.group(1))
-                    
-                    total_time = data.get('totalTime') or data.get('cookTime')
-                    if total_time:
-                        hours = re.search(r'(\d+)H', str(total_time))
-                        minutes = re.search(r'(\d+)M', str(total_time))
-                        total_mins = 0
-                        if hours:
-                            total_mins += int(hours.group(1)) * 60
-                        if minutes:
-                            total_mins += int(minutes.group(1))
-                        if total_mins > 0:
-                            result['total_time'] = total_mins
-                    
-                    ingredients = data.get('recipeIngredient', [])
-                    if isinstance(ingredients, list):
-                        result['ingredients'] = [str(ing).strip() for ing in ingredients if ing]
-                    
-                    instructions = data.get('recipeInstructions', [])
-                    if isinstance(instructions, list):
-                        for step in instructions:
-                            if isinstance(step, str):
-                                result['steps'].append(step.strip())
-                            elif isinstance(step, dict):
-                                text = step.get('text') or step.get('name', '')
-                                if text:
-                                    result['steps'].append(str(text).strip())
-                    
-                    if result['name'] and (result['ingredients'] or result['steps']):
-                        return result
-            except:
-                continue
-        
-        # Fallback: Try common HTML patterns
-        title_tag = soup.find('h1') or soup.find('title')
-        if title_tag:
-            result['name'] = title_tag.get_text(strip=True)
-        
-        # Try to find ingredients
-        for selector in ['[class*="ingredient"]', '[itemprop="recipeIngredient"]', '.ingredients li', 'ul.ingredients li']:
-            elements = soup.select(selector)
-            if elements:
-                result['ingredients'] = [el.get_text(strip=True) for el in elements if el.get_text(strip=True)]
-                break
-        
-        # Try to find steps
-        for selector in ['[class*="instruction"]', '[class*="step"]', '[itemprop="recipeInstructions"]', '.preparation li', '.steps li']:
-            elements = soup.select(selector)
-            if elements:
-                result['steps'] = [el.get_text(strip=True) for el in elements if el.get_text(strip=True)]
-                break
-        
-        # If still no data, include raw text for AI extraction
-        if not result['ingredients'] and not result['steps']:
-            # Get page text for AI fallback
-            for tag in soup(['script', 'style', 'nav', 'header', 'footer']):
-                tag.decompose()
-            result['raw_text'] = soup.get_text(separator='\n', strip=True)[:8000]
-            result['needs_ai_extraction'] = True
-        
-        return result
-        
-    except Exception as e:
-        return {"error": str(e), "url": url}
+# Refresh interval (seconds) of the widgets waiting for a background job
+JOB_POLL_INTERVAL = 0.5
+
+
+@st.cache_resource
+def get_worker() -> BackgroundWorker:
+    """Background worker (event loop + thread pool) shared across reruns and sessions."""
+    return BackgroundWorker(max_workers=st.secrets.get("worker_threads", WORKER_THREADS))
+
+
+def run_async(coro):
+    """Run a coroutine on the background event loop and wait for its result."""
+    return get_worker().run(coro)
+
+
+def submit_job(name: str, future) -> None:
+    """Track a background job of the current session under `name`."""
+    st.session_state.jobs[name] = future
+
+
+def job_running(name: str) -> bool:
+    """Whether the job `name` of the current session is still pending."""
+    return name in st.session_state.jobs
+
+
+def pop_job_result(name: str):
+    """Return the finished future of job `name` once, or None."""
+    return st.session_state.job_results.pop(name, None)
+
+
+@st.fragment(run_every=JOB_POLL_INTERVAL)
+def job_monitor(name: str, pending_text: str, progress: dict | None = None):
+    """Show a pending job and rerun the app once it has finished.
+    
+    Args:
+        name: Job name
+        pending_text: Text shown while the job runs (formatted with `progress`)
+        progress: Optional {"done", "total"} counters updated by the job
+    """
+    future = st.session_state.jobs.get(name)
+    if future is None:
+        return
+    if not future.done():
+        if progress:
+            st.progress(progress["done"] / max(progress["total"], 1), text=pending_text.format(**progress))
+        else:
+            st.markdown(pending_text)
+        return
+    st.session_state.job_results[name] = st.session_state.jobs.pop(name)
+    st.rerun()
+
+
+@st.cache_resource
+def get_scraper() -> RecipeScraper:
+    """Shared scraper reusing one pooled HTTP client and the on-disk scrape cache."""
+    return RecipeScraper(cache=default_scrape_cache())
+
+
+def start_scrape(url: str):
+    """Start scraping a recipe page on the background worker and return its future."""
+    return get_worker().submit_coroutine(get_scraper().scrape(url))
+
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def preprocess_uploaded_image(file_hash: str, _image_bytes: bytes, max_side: int, image_format: str, crop_to_text: bool) -> dict:
+    """Downscale and re-encode an uploaded photo once per content hash, as a Gemini inline blob."""
+    data, mime_type = preprocess_image(_image_bytes, max_side=max_side, image_format=image_format, crop_to_text=crop_to_text)
+    return {"mime_type": mime_type, "data": data}
+
+
+@st.cache_resource
+def get_session_manager() -> CookidooSessionManager:
+    """Shared Cookidoo session reused by every upload."""
+    return CookidooSessionManager(
+        st.secrets["cookidoo_email"],
+        st.secrets["cookidoo_password"],
+        country=st.secrets.get("cookidoo_country"),
+        language=st.secrets.get("cookidoo_language"),
+    )
 
 
 async def upload_to_cookidoo(name: str, ingredients: list, steps: list, servings: int = 4, prep_time: int = 30, total_time: int = 60, hints: list = None) -> dict:
     """Upload a custom recipe to Cookidoo."""
     try:
-        email = st.secrets["cookidoo_email"]
-        password = st.secrets["cookidoo_password"]
-        
-        service = CookidooService(email, password)
-        api = await service.login()
+        service = await get_session_manager().get_service()
         
         recipe_id = await service.create_custom_recipe(
             name=name,
@@ -659,7 +620,7 @@ async def upload_to_cookidoo(name: str, ingredients: list, steps: list, servings
             hints=hints
         )
         
-        localization = api.localization
+        localization = service.api_client.localization
         base_url = localization.url
         if not base_url.startswith('http'):
             base_url = f"https://{base_url}"
@@ -667,8 +628,6 @@ async def upload_to_cookidoo(name: str, ingredients: list, steps: list, servings
             base_url = base_url.split('/foundation/')[0]
         recipe_url = f"{base_url}/created-recipes/{recipe_id}"
         
-        await service.close()
-        
         return {
             "success": True,
             "recipe_id": recipe_id,
@@ -679,6 +638,12 @@ async def upload_to_cookidoo(name: str, ingredients: list, steps: list, servings
         return {"success": False, "error": str(e)}
 
 
+async def upload_recipe_batch(recipes: list[CustomRecipe]) -> list[dict]:
+    """Upload many validated recipes to Cookidoo over the shared session."""
+    service = await get_session_manager().get_service()
+    return await service.create_custom_recipes(recipes)
+
+
 # ==================== GEMINI SETUP ====================
 
 # Load system prompt
@@ -719,14 +684,68 @@ Présente TOUJOURS ta réponse dans ce format EXACT:
 IMPORTANT: Les "steps" et "ingredients" dans le JSON doivent être des STRINGS simples, pas des objets.
 """
 
+# Structured-output variant: the recipe is returned as a separate JSON field
+SYSTEM_PROMPT_STRUCTURED = SYSTEM_PROMPT + """
+
+---
 
-def clean_response_for_display(response_text: str) -> str:
-    """Remove JSON block from response for user display."""
-    # Remove JSON code block
-    cleaned = re.sub(r'```json\s*\{.*?\}\s*```', '', response_text, flags=re.DOTALL)
-    # Remove standalone JSON object at the end
-    cleaned = re.sub(r'\n\s*\{"name".*\}\s*$', '', cleaned, flags=re.DOTALL)
-    return cleaned.strip()
+## 5. Format de Sortie Final
+
+Ta réponse est un objet JSON à deux champs :
+
+- `display_text` : la réponse présentée à l'utilisateur, en Markdown, TOUJOURS dans ce format EXACT (sans aucun JSON) :
+
+### Avertissements
+(Si `[[ATTENTION : ÉQUIPEMENT SUPPLÉMENTAIRE REQUIS]]` est déclenché, affiche-le ici)
+
+### Ingrédients
+- Liste complète des ingrédients avec quantités
+
+### Instructions
+1. **[Titre étape]**: Description. **Temps / Température / Vitesse**.
+2. ...
+
+### Récapitulatif
+**Portions:** X | **Préparation:** X min | **Temps total:** X min
+
+- `recipe` : la recette adaptée pour l'upload (name, ingredients, steps, servings, prep_time, total_time, hints), ou null si ta réponse ne contient pas de recette complète.
+
+IMPORTANT: Les "steps" et "ingredients" de `recipe` sont des STRINGS simples, avec les temps, températures et vitesses dans le texte des étapes.
+"""
+
+
+@st.cache_resource
+def get_gemini_service(system_instruction: str, structured_output: bool = False) -> GeminiService:
+    """Gemini client and model shared by every session and rerun."""
+    return GeminiService(
+        st.secrets["gemini_api_key"],
+        system_instruction,
+        context_caching=st.secrets.get("gemini_context_caching", True),
+        structured_output=structured_output,
+        response_cache=PersistentCache(
+            cache_path("gemini_responses"),
+            ttl=float(st.secrets.get("gemini_response_cache_ttl", 7 * 24 * 3600)),
+            max_entries=2000,
+            compress=True,
+        ),
+    )
+
+
+def get_recipe_service() -> GeminiService:
+    """Gemini service adapting recipes, in structured-output (JSON mode) when enabled."""
+    if st.secrets.get("gemini_structured_output", False):
+        return get_gemini_service(SYSTEM_PROMPT_STRUCTURED, structured_output=True)
+    return get_gemini_service(SYSTEM_PROMPT_WITH_JSON)
+
+
+@st.cache_resource
+def get_batch_importer() -> BatchImporter:
+    """Batch importer shared by every session, so the rate limit applies app-wide."""
+    return BatchImporter(
+        get_recipe_service(),
+        max_workers=st.secrets.get("batch_max_workers", BATCH_MAX_WORKERS),
+        requests_per_minute=st.secrets.get("gemini_requests_per_minute", BATCH_REQUESTS_PER_MINUTE),
+    )
 
 
 def extract_url_from_message(message: str) -> str | None:
@@ -736,76 +755,6 @@ def extract_url_from_message(message: str) -> str | None:
     return match.group(0) if match else None
 
 
-def extract_recipe_json(response_text: str) -> dict | None:
-    """Extract JSON recipe data from Gemini response and normalize steps."""
-    data = None
-    
-    # Try to find JSON block
-    match = re.search(r'```json\s*(.*?)\s*```', response_text, re.DOTALL)
-    if match:
-        try:
-            data = json.loads(match.group(1))
-        except json.JSONDecodeError:
-            pass
-    
-    # Try to find raw JSON object
-    if not data:
-        match = re.search(r'\{[^{}]*"name"[^{}]*\}', response_text, re.DOTALL)
-        if match:
-            try:
-                data = json.loads(match.group(0))
-            except json.JSONDecodeError:
-                pass
-    
-    if not data:
-        return None
-    
-    # Normalize steps: if they are dicts, convert to plain text strings
-    if "steps" in data and isinstance(data["steps"], list):
-        normalized_steps = []
-        for step in data["steps"]:
-            if isinstance(step, dict):
-                # Extract description and combine with time/temp/speed if present
-                desc = step.get("description", step.get("text", ""))
-                time_val = step.get("time", "")
-                temp = step.get("temperature", "")
-                speed = step.get("speed", "")
-                # Build step text: "description. time / temp / speed"
-                parts = [desc]
-                if time_val and time_val != "0":
-                    details = [time_val]
-                    if temp and temp != "0°C":
-                        details.append(temp)
-                    if speed and speed != "Manuel":
-                        details.append(speed)
-                    if details:
-                        parts.append(" / ".join(details))
-                normalized_steps.append(". ".join(parts) if len(parts) > 1 else desc)
-            else:
-                normalized_steps.append(str(step))
-        data["steps"] = normalized_steps
-    
-    # Normalize ingredients: if they are dicts, extract text
-    if "ingredients" in data and isinstance(data["ingredients"], list):
-        normalized_ingredients = []
-        for ing in data["ingredients"]:
-            if isinstance(ing, dict):
-                # Extract text from dict
-                text = ing.get("text", ing.get("name", ing.get("ingredient", "")))
-                quantity = ing.get("quantity", ing.get("amount", ""))
-                if quantity and text:
-                    normalized_ingredients.append(f"{quantity} {text}")
-                elif text:
-                    normalized_ingredients.append(text)
-            else:
-                normalized_ingredients.append(str(ing))
-        data["ingredients"] = normalized_ingredients
-    
-    return data
-
-
-
-
 def check_password() -> bool:
     """Check if the user has entered the correct password."""
     if "authenticated" not in st.session_state:
@@ -875,56 +824,271 @@ def check_password() -> bool:
     return False
 
 
-def process_with_gemini(user_message: str, chat_history: list, scraped_data: dict = None) -> str:
-    """Process a message with Gemini. No function calls - single API call.
+def build_gemini_history(chat_history: list) -> list[dict]:
+    """Build a bounded Gemini history (recent turns + summary) from the chat messages."""
+    return HistoryManager(
+        window=st.secrets.get("history_window", HISTORY_WINDOW)
+    ).build(chat_history)
+
+
+def enrich_message(user_message: str, scraped_data: dict = None) -> str:
+    """Append pre-scraped recipe data (if a URL was detected) to the user message."""
+    enriched_message = user_message
+    if scraped_data:
+        if scraped_data.get("error"):
+            enriched_message += f"\n\n[Erreur lors de la récupération: {scraped_data['error']}]"
+        elif scraped_data.get("needs_ai_extraction"):
+            enriched_message += f"\n\n[Données non structurées - extrait le contenu de ce texte:]\n{scraped_data.get('raw_text', '')[:6000]}"
+        else:
+            enriched_message += f"\n\n[Données de recette extraites:]\n{json.dumps(scraped_data, ensure_ascii=False, indent=2)}"
+    
+    return enriched_message
+
+
+async def warm_up_for_url(service: GeminiService, cache: ScrapeCache | None, gemini_history: list[dict], prompt: str, url: str) -> None:
+    """Warm the model up while a recipe page is scraped. Runs on the background worker.
+    
+    When the page is already in the scrape cache the full message is known, so
+    the warm-up is skipped if its response is cached as well.
     
     Args:
-        user_message: The user's message
-        chat_history: Previous conversation history
-        scraped_data: Pre-scraped recipe data (if URL was detected)
+        service: Recipe adaptation service
+        cache: Scrape cache of the shared scraper
+        gemini_history: Gemini-formatted history
+        prompt: The user's message
+        url: Recipe page being scraped
+    """
+    entry = await cache.aget_entry(normalize_url(url)) if cache is not None else None
+    message = enrich_message(prompt, entry[0]) if entry else None
+    await asyncio.to_thread(service.warm_up, gemini_history, message)
+
+
+def build_reply(response_text: str, adaptation: RecipeAdaptation | None = None) -> dict:
+    """Split a Gemini answer into the text to display and the recipe to upload.
+    
+    Args:
+        response_text: Raw response text
+        adaptation: Structured-output answer, if JSON mode was used
     
     Returns:
-        The AI response text
+        {"text": raw text, "display": text without the JSON block, "recipe": recipe dict or None}
     """
-    genai.configure(api_key=st.secrets["gemini_api_key"])
+    if adaptation is not None:
+        recipe = adaptation.recipe.model_dump() if adaptation.recipe else None
+        return {"text": adaptation.display_text, "display": adaptation.display_text, "recipe": recipe}
+    return {
+        "text": response_text,
+        "display": clean_response_for_display(response_text),
+        "recipe": extract_recipe_json(response_text),
+    }
+
+
+def answer_with_gemini(service: GeminiService, gemini_history: list[dict], message: str) -> dict:
+    """Process a message with Gemini in a single API call. Runs on the background worker.
     
-    model = genai.GenerativeModel(
-        model_name="gemini-2.5-flash",
-        system_instruction=SYSTEM_PROMPT_WITH_JSON
-    )
+    Args:
+        service: Recipe adaptation service
+        gemini_history: Gemini-formatted history
+        message: The user's message, enriched with scraped data
     
-    # Build conversation history for Gemini
-    gemini_history = []
-    for msg in chat_history:
-        role = "user" if msg["role"] == "user" else "model"
-        gemini_history.append({"role": role, "parts": [msg["content"]]})
+    Returns:
+        The reply, see build_reply
+    """
+    if service.structured_output:
+        # JSON mode: the recipe comes back as its own field, no regex extraction
+        return build_reply("", service.adapt(gemini_history, message))
+    return build_reply(service.send_message(gemini_history, message))
+
+
+def analyze_image_with_gemini(service: GeminiService, image: dict) -> dict:
+    """Extract and adapt the recipe of a photo in a single API call. Runs on the background worker.
     
-    chat = model.start_chat(history=gemini_history)
+    Args:
+        service: Recipe adaptation service
+        image: Gemini inline blob of the preprocessed photo
     
-    # Enrich message with scraped data if available
-    enriched_message = user_message
-    if scraped_data:
-        if scraped_data.get("error"):
-            enriched_message += f"\n\n[Erreur lors de la récupération: {scraped_data['error']}]"
-        elif scraped_data.get("needs_ai_extraction"):
-            enriched_message += f"\n\n[Données non structurées - extrait le contenu de ce texte:]\n{scraped_data.get('raw_text', '')[:6000]}"
-        else:
-            enriched_message += f"\n\n[Données de recette extraites:]\n{json.dumps(scraped_data, ensure_ascii=False, indent=2)}"
+    Returns:
+        The reply, see build_reply
+    """
+    response_text = service.generate_content([
+        "Extrais la recette de cette image et adapte-la pour le Thermomix TM6 selon tes instructions. "
+        + ("Présente la version adaptée." if service.structured_output else "Présente la version adaptée et termine par le bloc JSON."),
+        image
+    ])
+    if service.structured_output:
+        return build_reply(response_text, parse_adaptation(response_text))
+    return build_reply(response_text)
+
+
+def record_reply(reply: dict) -> None:
+    """Store an assistant reply in the history and offer its recipe for upload."""
+    if reply["recipe"]:
+        st.session_state.pending_recipe = reply["recipe"]
     
-    response = chat.send_message(enriched_message)
+    # Check for equipment warning
+    if "[[ATTENTION : ÉQUIPEMENT SUPPLÉMENTAIRE REQUIS]]" in reply["text"]:
+        st.warning("⚠️ Attention : Cette recette nécessite un équipement supplémentaire (four, poêle, etc.) que le Thermomix ne peut pas remplacer.")
     
-    # Get response text
-    try:
-        return response.text
-    except:
-        if response.candidates and response.candidates[0].content:
-            text = ""
-            for part in response.candidates[0].content.parts:
-                if hasattr(part, 'text') and part.text:
-                    text += part.text
-            return text if text else "Désolé, je n'ai pas pu traiter cette demande."
+    # Store cleaned version in history
+    st.session_state.messages.append({"role": "assistant", "content": reply["display"]})
+
+
+def stream_with_gemini(gemini_history: list[dict], message: str):
+    """Process a message with Gemini, yielding the response as it is generated.
+    
+    Args:
+        gemini_history: Gemini-formatted history
+        message: The user's message, enriched with scraped data
+    
+    Yields:
+        Response text chunks
+    """
+    service = get_recipe_service()
+    yield from get_worker().stream(service.stream_message, gemini_history, message)
+
+
+def extract_batch(importer: BatchImporter, images: dict[str, dict], skip: set[str], progress: dict) -> list[tuple[str, dict]]:
+    """Extract every page on the background worker, counting completed pages in `progress`.
+    
+    Args:
+        importer: Shared batch importer
+        images: Gemini inline blobs keyed by page hash
+        skip: Hashes of pages already imported
+        progress: {"done", "total"} counters read by the page while the job runs
     
-    return "Désolé, je n'ai pas pu traiter cette demande."
+    Returns:
+        Page hashes and extraction results, in completion order
+    """
+    results = []
+    for page_hash, result in importer.extract_all(images, skip=skip):
+        results.append((page_hash, result))
+        progress["done"] += 1
+    return results
+
+
+def render_batch_import():
+    """Batch import of cookbook photos: concurrent extraction, review queue and bulk upload."""
+    with st.expander("📚 Import par lot (livre de cuisine)", expanded=bool(st.session_state.recipe_queue)):
+        uploaded_files = st.file_uploader(
+            "Photos des pages",
+            type=["jpg", "jpeg", "png", "webp"],
+            accept_multiple_files=True,
+            key="batch_upload"
+        )
+        
+        if uploaded_files:
+            # Deduplicate by content: identical photos and pages already imported are skipped
+            pages = {}
+            for uploaded in uploaded_files:
+                image_bytes = uploaded.getvalue()
+                pages.setdefault(hashlib.md5(image_bytes).hexdigest(), (uploaded.name, image_bytes))
+            new_pages = {h: page for h, page in pages.items() if h not in st.session_state.imported_page_hashes}
+            
+            skipped = len(uploaded_files) - len(new_pages)
+            if skipped:
+                st.caption(f"{skipped} page(s) en double ou déjà importée(s) ignorée(s)")
+            
+            if new_pages and st.button(
+                f"📷 Analyser {len(new_pages)} page(s)",
+                key="batch_analyze_btn",
+                disabled=job_running("batch_extract"),
+            ):
+                images = {
+                    h: preprocess_uploaded_image(
+                        h,
+                        image_bytes,
+                        st.secrets.get("image_max_side", IMAGE_MAX_SIDE),
+                        st.secrets.get("image_format", IMAGE_FORMAT),
+                        st.secrets.get("image_crop_to_text", False),
+                    )
+                    for h, (_, image_bytes) in new_pages.items()
+                }
+                
+                # Extraction runs on the background worker: reruns neither block on it nor cancel it
+                st.session_state.batch_page_names = {h: name for h, (name, _) in new_pages.items()}
+                st.session_state.batch_progress = {"done": 0, "total": len(images)}
+                submit_job("batch_extract", get_worker().submit(
+                    extract_batch,
+                    get_batch_importer(),
+                    images,
+                    set(st.session_state.imported_page_hashes),
+                    st.session_state.batch_progress,
+                ))
+        
+        job_monitor("batch_extract", "📷 {done}/{total} page(s) analysée(s)", st.session_state.get("batch_progress"))
+        
+        future = pop_job_result("batch_extract")
+        if future is not None:
+            try:
+                results = future.result()
+            except Exception as e:
+                st.error(f"Erreur lors de l'analyse: {str(e)}")
+            else:
+                for page_hash, result in results:
+                    name = st.session_state.batch_page_names.get(page_hash, page_hash)
+                    # Pages Gemini answered are done; failed calls can be retried
+                    if result["text"]:
+                        st.session_state.imported_page_hashes.add(page_hash)
+                    if result["recipe"]:
+                        st.session_state.recipe_queue.append({
+                            "hash": page_hash,
+                            "source": name,
+                            "recipe": result["recipe"].model_dump(),
+                        })
+                    else:
+                        st.warning(f"{name} : {result['error']}")
+        
+        if not st.session_state.recipe_queue:
+            return
+        
+        # Review queue
+        st.markdown(f"**📋 {len(st.session_state.recipe_queue)} recette(s) à valider**")
+        for item in list(st.session_state.recipe_queue):
+            recipe = item["recipe"]
+            col1, col2 = st.columns([4, 1])
+            with col1:
+                with st.popover(f"{recipe['name']} · {item['source']}", use_container_width=True):
+                    st.markdown("**Ingrédients**\n" + "\n".join(f"- {ing}" for ing in recipe["ingredients"]))
+                    st.markdown("**Instructions**\n" + "\n".join(f"{i}. {step}" for i, step in enumerate(recipe["steps"], 1)))
+                    st.caption(f"Portions: {recipe['servings']} | Préparation: {recipe['prep_time']} min | Temps total: {recipe['total_time']} min")
+            with col2:
+                if st.button("🗑️", key=f"queue_remove_{item['hash']}", disabled=job_running("batch_upload")):
+                    st.session_state.recipe_queue.remove(item)
+                    st.rerun()
+        
+        future = pop_job_result("batch_upload")
+        if future is not None:
+            try:
+                results = future.result()
+            except Exception as e:
+                st.error(f"Erreur lors de la publication: {str(e)}")
+            else:
+                # Keep only the failed recipes in the queue
+                uploaded = st.session_state.batch_upload_items
+                failed = {item["hash"] for item, result in zip(uploaded, results) if not result["success"]}
+                st.session_state.recipe_queue = [
+                    item for item in st.session_state.recipe_queue
+                    if item["hash"] in failed or item not in uploaded
+                ]
+                published = sum(1 for result in results if result["success"])
+                if published:
+                    st.success(f"✅ {published} recette(s) publiée(s) sur Cookidoo")
+                for result in results:
+                    if not result["success"]:
+                        st.error(f"{result['name']} : {result['error']}")
+            if not st.session_state.recipe_queue:
+                return
+        
+        if st.button(
+            f"✅ Publier {len(st.session_state.recipe_queue)} recette(s) sur Cookidoo",
+            key="batch_upload_btn",
+            type="primary",
+            disabled=job_running("batch_upload"),
+        ):
+            st.session_state.batch_upload_items = list(st.session_state.recipe_queue)
+            recipes = [CustomRecipe(**item["recipe"]) for item in st.session_state.batch_upload_items]
+            submit_job("batch_upload", get_worker().submit_coroutine(upload_recipe_batch(recipes)))
+        job_monitor("batch_upload", "⏳ Publication en cours...")
 
 
 def main_app():
@@ -941,6 +1105,14 @@ def main_app():
         st.session_state.pending_recipe = None
     if "processed_image_hash" not in st.session_state:
         st.session_state.processed_image_hash = None
+    if "jobs" not in st.session_state:
+        st.session_state.jobs = {}
+    if "job_results" not in st.session_state:
+        st.session_state.job_results = {}
+    if "recipe_queue" not in st.session_state:
+        st.session_state.recipe_queue = []
+    if "imported_page_hashes" not in st.session_state:
+        st.session_state.imported_page_hashes = set()
     
     # Show welcome card if no messages
     if not st.session_state.messages:
@@ -973,6 +1145,42 @@ def main_app():
         with st.chat_message(message["role"]):
             st.markdown(message["content"])
     
+    # Answers computed on the background worker (photo analysis, non-streamed chat)
+    for name in ("image", "chat"):
+        future = pop_job_result(name)
+        if future is None:
+            continue
+        with st.chat_message("assistant"):
+            try:
+                reply = future.result()
+                st.markdown(reply["display"])
+                record_reply(reply)
+            except Exception as e:
+                error_msg = f"Erreur: {str(e)}"
+                st.error(error_msg)
+                import traceback
+                st.code("".join(traceback.format_exception(e)))
+                if name == "chat":
+                    st.session_state.messages.append({"role": "assistant", "content": error_msg})
+    
+    if job_running("image") or job_running("chat"):
+        with st.chat_message("assistant"):
+            job_monitor("image", "📷 Lecture et adaptation de la recette...")
+            job_monitor("chat", "⏳ Adaptation de la recette...")
+    
+    # Result of the last upload
+    future = pop_job_result("upload")
+    if future is not None:
+        try:
+            result = future.result()
+            if result.get("success"):
+                st.success(f"✅ Recette publiée! [Voir sur Cookidoo]({result['url']})")
+                st.session_state.pending_recipe = None
+            else:
+                st.error(f"Erreur: {result.get('error', 'Erreur inconnue')}")
+        except Exception as e:
+            st.error(f"Erreur lors de la publication: {str(e)}")
+    
     # Show pending recipe upload button if available
     if st.session_state.pending_recipe:
         recipe = st.session_state.pending_recipe
@@ -981,24 +1189,17 @@ def main_app():
         with col1:
             st.markdown(f"**📋 Recette prête:** {recipe.get('name', 'Sans nom')}")
         with col2:
-            if st.button("✅ Publier sur Cookidoo", key="upload_btn", type="primary"):
-                with st.spinner("Publication en cours..."):
-                    try:
-                        result = asyncio.run(upload_to_cookidoo(
-                            name=recipe.get("name", "Recette"),
-                            ingredients=recipe.get("ingredients", []),
-                            steps=recipe.get("steps", []),
-                            servings=recipe.get("servings", 4),
-                            prep_time=recipe.get("prep_time", 30),
-                            total_time=recipe.get("total_time", 60)
-                        ))
-                        if result.get("success"):
-                            st.success(f"✅ Recette publiée! [Voir sur Cookidoo]({result['url']})")
-                            st.session_state.pending_recipe = None
-                        else:
-                            st.error(f"Erreur: {result.get('error', 'Erreur inconnue')}")
-                    except Exception as e:
-                        st.error(f"Erreur lors de la publication: {str(e)}")
+            if st.button("✅ Publier sur Cookidoo", key="upload_btn", type="primary", disabled=job_running("upload")):
+                # Upload on the background worker; the page stays responsive meanwhile
+                submit_job("upload", get_worker().submit_coroutine(upload_to_cookidoo(
+                    name=recipe.get("name", "Recette"),
+                    ingredients=recipe.get("ingredients", []),
+                    steps=recipe.get("steps", []),
+                    servings=recipe.get("servings", 4),
+                    prep_time=recipe.get("prep_time", 30),
+                    total_time=recipe.get("total_time", 60)
+                )))
+        job_monitor("upload", "⏳ Publication en cours...")
     
     # Image upload section - only show when no messages yet
     if not st.session_state.messages:
@@ -1020,91 +1221,109 @@ def main_app():
             # Check if this image was already processed
             if st.session_state.processed_image_hash != file_hash:
                 # Button to trigger analysis (fallback for Samsung)
-                if st.button("📷 Analyser cette image", key="analyze_img_btn"):
+                if st.button("📷 Analyser cette image", key="analyze_img_btn", disabled=job_running("image")):
                     st.session_state.processed_image_hash = file_hash
                     
-                    with st.spinner("📷 Lecture et adaptation de la recette..."):
-                        try:
-                            import PIL.Image
-                            import io
-                            
-                            image = PIL.Image.open(io.BytesIO(image_bytes))
-                            
-                            # Single API call: extract + adapt with system prompt
-                            genai.configure(api_key=st.secrets["gemini_api_key"])
-                            model = genai.GenerativeModel(
-                                "gemini-2.5-flash",
-                                system_instruction=SYSTEM_PROMPT_WITH_JSON
-                            )
-                            
-                            response = model.generate_content([
-                                "Extrais la recette de cette image et adapte-la pour le Thermomix TM6 selon tes instructions. Présente la version adaptée et termine par le bloc JSON.",
-                                image
-                            ])
-                            
-                            response_text = response.text
-                            
-                            # Extract JSON for upload button
-                            recipe_json = extract_recipe_json(response_text)
-                            if recipe_json:
-                                st.session_state.pending_recipe = recipe_json
+                    try:
+                        image = preprocess_uploaded_image(
+                            file_hash,
+                            image_bytes,
+                            st.secrets.get("image_max_side", IMAGE_MAX_SIDE),
+                            st.secrets.get("image_format", IMAGE_FORMAT),
+                            st.secrets.get("image_crop_to_text", False),
+                        )
                             
-                            st.session_state.messages.append({"role": "assistant", "content": response_text})
-                            st.rerun()
+                        # Single API call: extract + adapt with system prompt, on the background worker
+                        submit_job("image", get_worker().submit(analyze_image_with_gemini, get_recipe_service(), image))
+                        st.rerun()
                             
-                        except Exception as e:
-                            st.error(f"Erreur lors de l'analyse: {str(e)}")
-                            import traceback
-                            st.code(traceback.format_exc())
+                    except Exception as e:
+                        st.error(f"Erreur lors de l'analyse: {str(e)}")
+                        import traceback
+                        st.code(traceback.format_exc())
+    
+    # Batch import of cookbook pages
+    render_batch_import()
     
     # Chat input
-    if prompt := st.chat_input("Collez une URL ou décrivez votre envie..."):
+    if prompt := st.chat_input(
+        "Collez une URL ou décrivez votre envie...",
+        disabled=job_running("chat") or job_running("image"),
+    ):
         st.session_state.messages.append({"role": "user", "content": prompt})
         
         with st.chat_message("user"):
             st.markdown(prompt)
         
         with st.chat_message("assistant"):
-            with st.spinner(""):
-                try:
-                    history = st.session_state.messages[:-1]
-                    
-                    # Pre-scrape URL if detected (avoids function call)
-                    scraped_data = None
-                    url = extract_url_from_message(prompt)
-                    if url:
-                        with st.spinner("🔍 Récupération de la recette..."):
-                            scraped_data = scrape_recipe_from_url(url)
+            try:
+                # Start scraping a detected URL right away (avoids function call);
+                # history preparation and model warm-up overlap the download
+                url = extract_url_from_message(prompt)
+                scrape_job = start_scrape(url) if url else None
+                
+                gemini_history = build_gemini_history(st.session_state.messages[:-1])
+                
+                scraped_data = None
+                if scrape_job:
+                    get_worker().submit_coroutine(warm_up_for_url(
+                        get_recipe_service(), get_scraper().cache, gemini_history, prompt, url
+                    ))
+                    with st.spinner("🔍 Récupération de la recette..."):
+                        scraped_data = scrape_job.result()
                     
-                    # Single API call
-                    response_text = process_with_gemini(prompt, history, scraped_data)
+                    # Early preview of structured (JSON-LD) results while Gemini adapts the recipe
+                    if scraped_data.get("name") and not scraped_data.get("needs_ai_extraction"):
+                        st.caption(
+                            f"🔍 {scraped_data['name']} · {len(scraped_data.get('ingredients', []))} ingrédients"
+                            f" · {len(scraped_data.get('steps', []))} étapes"
+                        )
+                
+                message = enrich_message(prompt, scraped_data)
+                
+                service = get_recipe_service()
+                if service.structured_output or not st.secrets.get("gemini_streaming", True):
+                    # Single API call on the background worker; the job monitor reruns the page with the answer
+                    submit_job("chat", get_worker().submit(answer_with_gemini, service, gemini_history, message))
+                    st.rerun()
+                else:
+                    # Stream tokens as they arrive; the JSON block is parsed as soon as it closes
+                    parser = StreamingResponseParser()
+                    stream_area = st.container()
+                    recipe_notice = st.empty()
                     
-                    # Extract JSON for upload button BEFORE display
-                    recipe_json = extract_recipe_json(response_text)
-                    if recipe_json:
-                        st.session_state.pending_recipe = recipe_json
+                    def display_stream():
+                        for chunk in stream_with_gemini(gemini_history, message):
+                            delta = parser.feed(chunk)
+                            if parser.recipe and st.session_state.pending_recipe is not parser.recipe:
+                                st.session_state.pending_recipe = parser.recipe
+                                recipe_notice.markdown(f"**📋 Recette prête:** {parser.recipe.get('name', 'Sans nom')}")
+                            if delta:
+                                yield delta
+                        tail = parser.finish()
+                        if tail:
+                            yield tail
                     
-                    # Clean response for display (remove JSON block)
-                    display_text = clean_response_for_display(response_text)
-                    st.markdown(display_text)
+                    with stream_area:
+                        st.write_stream(display_stream())
                     
-                    # Check for equipment warning
-                    if "[[ATTENTION : ÉQUIPEMENT SUPPLÉMENTAIRE REQUIS]]" in response_text:
-                        st.warning("⚠️ Attention : Cette recette nécessite un équipement supplémentaire (four, poêle, etc.) que le Thermomix ne peut pas remplacer.")
-                        
-                    # Store cleaned version in history
-                    st.session_state.messages.append({"role": "assistant", "content": display_text})
+                    reply = {
+                        "text": parser.text,
+                        "display": clean_response_for_display(parser.text),
+                        "recipe": parser.recipe,
+                    }
+                    record_reply(reply)
                     
                     # Rerun to show upload button
-                    if recipe_json:
+                    if reply["recipe"]:
                         st.rerun()
-                    
-                except Exception as e:
-                    error_msg = f"Erreur: {str(e)}"
-                    st.error(error_msg)
-                    import traceback
-                    st.code(traceback.format_exc())
-                    st.session_state.messages.append({"role": "assistant", "content": error_msg})
+                
+            except Exception as e:
+                error_msg = f"Erreur: {str(e)}"
+                st.error(error_msg)
+                import traceback
+                st.code(traceback.format_exc())
+                st.session_state.messages.append({"role": "assistant", "content": error_msg})
 
 
 # Main entry point